@@ -2,12 +2,33 @@
 
 
 import contextlib
+import copy
 import json
+import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from cci.utils.config_utils import normalize_config_name
-from cci.utils.models_fetch import fetch_models, list_models
+from cci.utils.config_utils import MODEL_TYPES, normalize_config_name
+from cci.utils.models_fetch import clear_models_cache, list_models
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# Reused stdlib encoder for the fallback path; json.dumps(indent=2) would build a new one per call
+_JSON_ENCODER = json.JSONEncoder(indent=2)
+
+_VALID_MODEL_TYPES = frozenset(MODEL_TYPES)
+
+# Environment variable Claude Code reads for each model type
+_MODEL_ENV_KEYS = {
+    'haiku': 'ANTHROPIC_DEFAULT_HAIKU_MODEL',
+    'sonnet': 'ANTHROPIC_DEFAULT_SONNET_MODEL',
+    'opus': 'ANTHROPIC_DEFAULT_OPUS_MODEL'
+}
 
 
 class ConfigManager:
@@ -25,8 +46,63 @@ class ConfigManager:
         else:
             self.config_dir = Path(config_dir)
 
+        # Create config directory if it doesn't exist
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+
         self.config_file = self.config_dir / 'config.json'
-        self.config = self._load_config()
+        self._config: Optional[Dict[str, Any]] = None
+
+        # Saves requested inside a ``with config_manager:`` block are deferred to its exit;
+        # the snapshot taken on entry is restored if the block raises
+        self._batch_depth = 0
+        self._dirty = False
+        self._batch_snapshot: Optional[Dict[str, Any]] = None
+
+    def __enter__(self) -> 'ConfigManager':
+        """
+        Start a batch of changes that is written to disk once, when the outermost block exits.
+
+        :return: This configuration manager
+        :rtype: ConfigManager
+        """
+        if self._batch_depth == 0:
+            self._batch_snapshot = copy.deepcopy(self._config)
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Finish a batch of changes, writing the config if anything was saved during it.
+
+        If the block raised, the config is rolled back to its state before the batch and
+        nothing is written, so a half-finished batch never reaches disk.
+        """
+        self._batch_depth -= 1
+        if self._batch_depth:
+            return
+
+        snapshot, self._batch_snapshot = self._batch_snapshot, None
+        if exc_info[0] is not None:
+            self._config = snapshot
+            self._dirty = False
+        elif self._dirty:
+            self._write_config()
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        Configuration dictionary, loaded from disk on first access.
+
+        :return: Configuration dictionary
+        :rtype: Dict[str, Any]
+        """
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
+
+    @config.setter
+    def config(self, value: Dict[str, Any]) -> None:
+        self._config = value
 
     def _load_config(self) -> Dict[str, Any]:
         """
@@ -35,33 +111,51 @@ class ConfigManager:
         :return: Configuration dictionary
         :rtype: Dict[str, Any]
         """
-        # Create config directory if it doesn't exist
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-
-        # Load config file if it exists
-        if self.config_file.exists():
-            with contextlib.suppress(json.JSONDecodeError, IOError):
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+        # Load config file if it exists; a missing file raises FileNotFoundError, an IOError.
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so one suppress covers both parsers
+        with contextlib.suppress(json.JSONDecodeError, IOError):
+            data = self.config_file.read_bytes()
+            return orjson.loads(data) if orjson is not None else json.loads(data)
         # Return default config
         return {
             'providers': {},
-            'models': {
-                'haiku': None,
-                'sonnet': None,
-                'opus': None
-            },
+            'models': dict.fromkeys(MODEL_TYPES),
             'configs': {},
             'default_config': None
         }
 
     def save_config(self) -> None:
-        """Save configuration to file."""
+        """Save configuration to file, or mark it for saving at the end of the current batch."""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._write_config()
+
+    def _write_config(self) -> None:
+        """Write the configuration to file."""
+        self._dirty = False
         self.config_dir.mkdir(parents=True, exist_ok=True)
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+        else:
+            data = _JSON_ENCODER.encode(self.config).encode()
 
-    def add_provider(self, name: str, base_url: str, api_key: str = "", api_key_type: str = "none") -> bool:
+        # Write to a temporary file and rename it over the config so an interrupted
+        # save never leaves a half-written config.json behind
+        fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix='config.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def add_provider(self, name: str, base_url: str, api_key: str = "", api_key_type: str = "none",
+                     models: Optional[List[str]] = None) -> bool:
         """
         Add a new model provider.
 
@@ -73,16 +167,20 @@ class ConfigManager:
         :type api_key: str
         :param api_key_type: Type of API key handling (direct, envvar, none)
         :type api_key_type: str
+        :param models: Already-fetched model list; skips fetching from the provider if given
+        :type models: Optional[List[str]]
         :return: True if successful, False otherwise
         :rtype: bool
         """
         try:
-            # Resolve the actual API key value based on the API key type
-            actual_api_key = self.resolve_api_key(api_key, api_key_type)
+            if models is not None:
+                model_list = models
+            else:
+                # Resolve the actual API key value based on the API key type
+                actual_api_key = self.resolve_api_key(api_key, api_key_type)
 
-            # Fetch models from the provider using the API key for authentication
-            models_data = fetch_models(base_url, actual_api_key)
-            model_list = list_models(base_url, actual_api_key) if models_data else []
+                # Fetch and parse models from the provider in one request using the API key for authentication
+                model_list = list_models(base_url, actual_api_key)
 
             # Add provider to config
             self.config['providers'][name] = {
@@ -104,16 +202,21 @@ class ConfigManager:
         :param name: Name of the provider to remove
         :type name: str
         """
-        if name in self.config['providers']:
-            # Remove associated configurations first
+        if name not in self.config['providers']:
+            return
+
+        # set_default_if_just_one_config saves as well, so batch the changes into one write
+        with self:
+            # Remove associated configurations first; the names come straight from
+            # the configs dict, so each one is present exactly once
+            configs = self.config['configs']
             configs_to_remove = self.get_configs_for_provider(name)
             for config_name in configs_to_remove:
-                if config_name in self.config['configs']:
-                    del self.config['configs'][config_name]
+                del configs[config_name]
 
-                    # Reset default config if it was the one removed
-                    if self.config['default_config'] == config_name:
-                        self.config['default_config'] = None
+            # Reset default config if it was one of the removed ones
+            if self.config['default_config'] in configs_to_remove:
+                self.config['default_config'] = None
 
             del self.config['providers'][name]
             self.set_default_if_just_one_config()
@@ -148,16 +251,19 @@ class ConfigManager:
         :rtype: bool
         """
         # If there's no default config set, nothing to check
-        if self.config['default_config'] is not None:
-            # Check if the default config still exists
-            if self.config['default_config'] not in self.config['configs']:
-                # Default config no longer exists, set to None
-                self.config['default_config'] = None
-                self.save_config()
+        default_config = self.config['default_config']
+        if default_config is None:
+            # There may be configs available to choose from, but prompting is handled in the UI
+            return False
+
+        # Check if the default config still exists
+        if default_config not in self.config['configs']:
+            # Default config no longer exists, set to None
+            self.config['default_config'] = None
+            self.save_config()
+            return False
 
-        # If there's no default config set but there are configs available,
-        # we could prompt the user to select one, but this should be handled in the UI
-        return self.config['default_config'] is not None
+        return True
 
     def update_provider(self, name: str) -> bool:
         """
@@ -168,6 +274,8 @@ class ConfigManager:
         :return: True if successful, False otherwise
         :rtype: bool
         """
+        # An explicit update must bypass the in-process model list cache
+        clear_models_cache()
         model_list = self.get_live_models_for_provider(name)
         if model_list is None:
             return False
@@ -184,14 +292,11 @@ class ConfigManager:
         :return: List of configuration names that use the provider
         :rtype: List[str]
         """
+        # A plain scan rather than a provider index: callers edit config['configs'] directly,
+        # so an index maintained alongside it would go stale
         configs = self.config.get('configs', {})
-        associated_configs = []
-
-        for config_name, config_data in configs.items():
-            if config_data.get('provider') == provider_name:
-                associated_configs.append(config_name)
-
-        return associated_configs
+        return [config_name for config_name, config_data in configs.items()
+                if config_data.get('provider') == provider_name]
 
     def resolve_api_key(self, api_key: str, api_key_type: str) -> str:
         """
@@ -207,7 +312,6 @@ class ConfigManager:
         if api_key_type == 'direct':
             return api_key
         elif api_key_type == 'envvar':
-            import os
             return os.environ.get(api_key, '')
         return ''
 
@@ -220,11 +324,11 @@ class ConfigManager:
         :return: List of live model names, or None if fetch failed
         :rtype: Optional[List[str]]
         """
-        if provider_name not in self.config['providers']:
+        provider = self.config['providers'].get(provider_name)
+        if provider is None:
             return None
 
         try:
-            provider = self.config['providers'][provider_name]
             base_url = provider['base_url']
             api_key = provider.get('api_key', '')
             api_key_type = provider.get('api_key_type', 'none')
@@ -247,7 +351,7 @@ class ConfigManager:
         :return: True if successful, False otherwise
         :rtype: bool
         """
-        if model_type not in ['haiku', 'sonnet', 'opus']:
+        if model_type not in _VALID_MODEL_TYPES:
             return False
 
         self.config['models'][model_type] = model_name
@@ -272,10 +376,11 @@ class ConfigManager:
         :return: List of available model names
         :rtype: List[str]
         """
-        if provider_name not in self.config['providers']:
+        provider = self.config['providers'].get(provider_name)
+        if provider is None:
             return []
 
-        return self.config['providers'][provider_name].get('models', [])
+        return provider.get('models', [])
 
     def save_config_as(self, name: str, provider_name: str) -> None:
         """
@@ -302,20 +407,18 @@ class ConfigManager:
         :return: Dictionary of provider base URL, models, and API key info, or empty dict if not found
         :rtype: dict
         """
-        if name not in self.config['configs']:
+        config = self.config['configs'].get(name)
+        if config is None:
             return {}
 
-        provider = self.config['configs'][name]['provider']
-
         # Check if provider exists
-        if provider not in self.config['providers']:
+        provider_config = self.config['providers'].get(config['provider'])
+        if provider_config is None:
             return {}
 
-        provider_config = self.config['providers'][provider]
-
         return {
             'base_url': provider_config['base_url'],
-            'models': self.config['configs'][name]['models'],
+            'models': config['models'],
             'api_key': provider_config.get('api_key', ''),
             'api_key_type': provider_config.get('api_key_type', 'none')
         }
@@ -344,7 +447,7 @@ class ConfigManager:
         If there is only one saved configuration, set it as the default.
         """
         if len(self.config['configs']) == 1:
-            only_config_name = list(self.config['configs'].keys())[0]
+            only_config_name = next(iter(self.config['configs']))
             self.config['default_config'] = only_config_name
             self.save_config()
 
@@ -362,10 +465,9 @@ class ConfigManager:
         api_key_value = config.get('api_key', '')
         api_key = self.resolve_api_key(api_key_value, api_key_type)
 
+        models = config['models']
         return {
-            'ANTHROPIC_DEFAULT_HAIKU_MODEL': config['models']['haiku'],
-            'ANTHROPIC_DEFAULT_SONNET_MODEL': config['models']['sonnet'],
-            'ANTHROPIC_DEFAULT_OPUS_MODEL': config['models']['opus'],
+            **{env_key: models[model_type] for model_type, env_key in _MODEL_ENV_KEYS.items()},
             'ANTHROPIC_BASE_URL': config['base_url'],
             'ANTHROPIC_API_KEY': api_key,
             "ANTHROPIC_AUTH_TOKEN": "",
@@ -373,11 +475,30 @@ class ConfigManager:
 
 
 # Convenience functions
-def get_config_manager() -> ConfigManager:
+def get_config_manager(config_dir: Optional[str] = None) -> ConfigManager:
+    """
+    Get the shared configuration manager instance for a configuration directory.
+
+    Equivalent spellings of the same directory (the default, ``~`` paths, relative
+    paths) share one instance, so their in-memory configs can't overwrite each other.
+
+    :param config_dir: Directory to store configuration files. Defaults to ~/.config/cci
+    :type config_dir: Optional[str]
+    :return: Configuration manager instance
+    :rtype: ConfigManager
+    """
+    path = Path.home() / '.config' / 'cci' if config_dir is None else Path(config_dir).expanduser()
+    return _get_config_manager(path.resolve())
+
+
+@lru_cache(maxsize=None)
+def _get_config_manager(config_dir: Path) -> ConfigManager:
     """
-    Get a configuration manager instance.
+    Get the configuration manager for a resolved configuration directory, creating it on first use.
 
+    :param config_dir: Absolute, resolved configuration directory
+    :type config_dir: Path
     :return: Configuration manager instance
     :rtype: ConfigManager
     """
-    return ConfigManager()
+    return ConfigManager(str(config_dir))
@@ -9,16 +9,49 @@ testing environments through dual implementations of prompt handlers.
 import os
 import sys
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from functools import lru_cache
+from typing import Any, List, Optional
 
 import inquirer  # type: ignore
 import requests
 from rich.console import Console
 from rich.prompt import Prompt
 
-from cci.config import ConfigManager
+from cci.config import get_config_manager
 from cci.utils.config_utils import normalize_config_name
-from cci.utils.models_fetch import fetch_models, list_models
+from cci.utils.models_fetch import fetch_models, parse_model_names
+
+
+@lru_cache(maxsize=64)
+def _choice_numbers(count: int) -> List[str]:
+    """Build the numeric answer choices ("1".."count") for a numbered prompt.
+
+    Cached per list length since the same lengths are prompted repeatedly. The
+    returned list is shared and must not be mutated.
+
+    :param count: Number of choices
+    :type count: int
+    :return: List of choice numbers as strings
+    :rtype: List[str]
+    """
+    return [str(i) for i in range(1, count + 1)]
+
+
+# Main menu labels mapped to the action identifiers returned by show_menu
+_MENU_ACTIONS = {
+    'Add Provider': '1',
+    'List Providers': '2',
+    'Delete Provider': '3',
+    'Create Config': '4',
+    'List Configs': '5',
+    'Set Default Config': '6',
+    'Delete Config': '7',
+    'Quit': 'q'
+}
+
+
+# Extra choice appended to selection lists that returns to the main menu
+_BACK_CHOICE = '← Back'
 
 
 class PromptHandler(ABC):
@@ -167,10 +200,8 @@ class PromptHandler(ABC):
         :return: None
         :rtype: None
         """
-        if style:
-            self.console.print(f"[{style}]{message}[/{style}]")
-        else:
-            self.console.print(message)
+        # Unstyled messages (separators, list lines) skip the markup wrapping entirely
+        self.console.print(f"[{style}]{message}[/{style}]" if style else message)
 
     def wait_for_continue(self) -> None:
         """Wait for the user to press Enter to continue.
@@ -206,23 +237,34 @@ class InquirerPromptHandler(PromptHandler):
         :type console: Console
         """
         super().__init__(console)
-
-    def select_option(self, message: str, choices: List[str], default: Optional[str] = None) -> str:
-        questions = [
-            inquirer.List('option',
-                          message=message,
-                          choices=choices,
-                          default=default)
-        ]
+        # The main menu is redrawn on every loop iteration, so build its question once
+        self._menu_question = inquirer.List('option',
+                                            message="Select an option",
+                                            choices=list(_MENU_ACTIONS))
+
+    def _prompt(self, question: Any) -> Any:
+        """Ask a single inquirer question, exiting cleanly on Ctrl+C.
+
+        :param question: Inquirer question to ask
+        :type question: inquirer.questions.Question
+        :return: The answer to the question
+        :rtype: Any
+        """
         try:
-            answers = inquirer.prompt(questions)
+            answers = inquirer.prompt([question])
             if answers is None:
                 raise KeyboardInterrupt
-            return answers['option']
+            return answers[question.name]
         except KeyboardInterrupt:
             self.console.print("\n[green]Goodbye![/green]")
             sys.exit(0)
 
+    def select_option(self, message: str, choices: List[str], default: Optional[str] = None) -> str:
+        return self._prompt(inquirer.List('option',
+                                          message=message,
+                                          choices=choices,
+                                          default=default))
+
     def select_provider(self, providers: List[str]) -> str:
         return self.select_option("Select provider", providers)
 
@@ -247,33 +289,13 @@ class InquirerPromptHandler(PromptHandler):
         return selected.split(" (*default)")[0]
 
     def confirm_action(self, message: str, default: str = "n") -> bool:
-        questions = [
-            inquirer.Confirm('confirm',
-                             message=message,
-                             default=default.lower() == 'y')
-        ]
-        try:
-            answers = inquirer.prompt(questions)
-            if answers is None:
-                raise KeyboardInterrupt
-            return answers['confirm']
-        except KeyboardInterrupt:
-            self.console.print("\n[green]Goodbye![/green]")
-            sys.exit(0)
+        return self._prompt(inquirer.Confirm('confirm',
+                                             message=message,
+                                             default=default.lower() == 'y'))
 
     def get_input(self, message: str) -> str:
-        questions = [
-            inquirer.Text('input',
-                          message=message)
-        ]
-        try:
-            answers = inquirer.prompt(questions)
-            if answers is None:
-                raise KeyboardInterrupt
-            return answers['input']
-        except KeyboardInterrupt:
-            self.console.print("\n[green]Goodbye![/green]")
-            sys.exit(0)
+        return self._prompt(inquirer.Text('input',
+                                          message=message))
 
     def show_menu(self) -> str:
         """Display main menu using inquirer library for interactive selection.
@@ -286,35 +308,15 @@ class InquirerPromptHandler(PromptHandler):
         :return: Selected menu option identifier
         :rtype: str
         """
-        self.console.clear()
+        self.clear_screen()
         self.console.print("[bold blue]Claude Code Interceptor Configuration[/bold blue]")
         self.console.print("=" * 40)
         self.console.print("[dim](Press Ctrl+C at any time to quit)[/dim]")
         self.console.print()
 
-        choices = [
-            'Add Provider',
-            'List Providers',
-            'Delete Provider',
-            'Create Config',
-            'List Configs',
-            'Set Default Config',
-            'Delete Config',
-            'Quit'
-        ]
-        selected = self.select_option("Select an option", choices)
+        selected = self._prompt(self._menu_question)
         # Map the selection to the corresponding action
-        action_map = {
-            'Add Provider': '1',
-            'List Providers': '2',
-            'Delete Provider': '3',
-            'Create Config': '4',
-            'List Configs': '5',
-            'Set Default Config': '6',
-            'Delete Config': '7',
-            'Quit': 'q'
-        }
-        return action_map.get(selected, 'q')
+        return _MENU_ACTIONS.get(selected, 'q')
 
 
 class TestPromptHandler(PromptHandler):
@@ -328,6 +330,9 @@ class TestPromptHandler(PromptHandler):
     rich interactive prompts suitable for human users in interactive environments.
     """
 
+    # Not a test case; keeps pytest from trying to collect this class by its name
+    __test__ = False
+
     def __init__(self, console: Console):
         """Initialize the test prompt handler.
 
@@ -336,23 +341,30 @@ class TestPromptHandler(PromptHandler):
         """
         super().__init__(console)
 
+    def _print_numbered(self, items: List[str]) -> None:
+        """Print items as a 1-based numbered list in a single console write.
+
+        :param items: Items to print
+        :type items: List[str]
+        :return: None
+        :rtype: None
+        """
+        self.console.print("\n".join(f"{i}. {item}" for i, item in enumerate(items, 1)))
+
     def select_option(self, message: str, choices: List[str], default: Optional[str] = None) -> str:
         # For testing, we display the choices and ask for input
         self.console.print(message)
-        for i, choice in enumerate(choices, 1):
-            self.console.print(f"{i}. {choice}")
+        self._print_numbered(choices)
 
-        choice_numbers = [str(i) for i in range(1, len(choices) + 1)]
-        choice = Prompt.ask("[bold cyan]Select an option[/bold cyan]", choices=choice_numbers)
+        choice = Prompt.ask("[bold cyan]Select an option[/bold cyan]", choices=_choice_numbers(len(choices)))
         return choices[int(choice) - 1]
 
     def select_provider(self, providers: List[str]) -> str:
         self.console.print("Available providers:")
-        for i, provider in enumerate(providers, 1):
-            self.console.print(f"{i}. {provider}")
+        self._print_numbered(providers)
 
         choice = Prompt.ask("[bold cyan]Select provider[/bold cyan]",
-                            choices=[str(i) for i in range(1, len(providers) + 1)])
+                            choices=_choice_numbers(len(providers)))
         return providers[int(choice) - 1]
 
     def select_model(self, model_type: str, models: List[str]) -> Optional[str]:
@@ -361,23 +373,23 @@ class TestPromptHandler(PromptHandler):
             return None
 
         self.console.print(f"Available models for {model_type}:")
-        for i, model in enumerate(models, 1):  # Start numbering from 1
-            self.console.print(f"{i}. {model}")
+        self._print_numbered(models)
 
         # Require user to select a model (no "None" option)
         choice = Prompt.ask(f"[bold cyan]Select model for {model_type}[/bold cyan]",
-                            choices=[str(i) for i in range(1, len(models) + 1)])
+                            choices=_choice_numbers(len(models)))
         selected = models[int(choice) - 1]  # Adjust for 1-based indexing
         return selected
 
     def select_config(self, configs: List[str], default_config: Optional[str] = None) -> str:
         self.console.print("Available configurations:")
-        for i, name in enumerate(configs, 1):
-            is_default = " ([bold green]*default[/bold green])" if name == default_config else ""
-            self.console.print(f"{i}. {name}{is_default}")
+        self._print_numbered([
+            f"{name} ([bold green]*default[/bold green])" if name == default_config else name
+            for name in configs
+        ])
 
         choice = Prompt.ask("[bold cyan]Select configuration to set as default[/bold cyan]",
-                            choices=[str(i) for i in range(1, len(configs) + 1)])
+                            choices=_choice_numbers(len(configs)))
         return configs[int(choice) - 1]
 
     def confirm_action(self, message: str, default: str = "n") -> bool:
@@ -398,7 +410,7 @@ class TestPromptHandler(PromptHandler):
         :return: Selected menu option identifier
         :rtype: str
         """
-        self.console.clear()
+        self.clear_screen()
         self.console.print("[bold blue]Claude Code Interceptor Configuration[/bold blue]")
         self.console.print("=" * 40)
         self.console.print("1. Add Provider")
@@ -422,16 +434,18 @@ def get_prompt_handler(console: Console) -> PromptHandler:
     for automated testing environments. This allows the application to provide an
     optimal user experience in interactive mode while remaining testable in CI/CD.
 
+    The environment is checked on every call rather than once at import time: pytest
+    only sets PYTEST_CURRENT_TEST while a test is running, after this module has
+    already been imported during collection.
+
     :param console: Rich console instance for output
     :type console: Console
     :return: Appropriate prompt handler for the current environment
     :rtype: PromptHandler
     """
-    is_test = 'PYTEST_CURRENT_TEST' in os.environ
-    if is_test:
+    if 'PYTEST_CURRENT_TEST' in os.environ:
         return TestPromptHandler(console)
-    else:
-        return InquirerPromptHandler(console)
+    return InquirerPromptHandler(console)
 
 
 class ConfigTUI:
@@ -448,13 +462,13 @@ class ConfigTUI:
     """
 
     def __init__(self):
-        """Initialize the TUI with a ConfigManager and Rich console.
+        """Initialize the TUI with the shared ConfigManager and a Rich console.
 
         Automatically selects the appropriate prompt handler based on the environment
         to provide the best user experience for interactive use or reliable behavior
         in automated testing scenarios.
         """
-        self.config_manager = ConfigManager()
+        self.config_manager = get_config_manager()
         self.console = Console()
         self.prompt_handler = get_prompt_handler(self.console)
 
@@ -468,26 +482,26 @@ class ConfigTUI:
         :return: None
         :rtype: None
         """
+        dispatch = {
+            "1": self._add_provider,
+            "2": self._list_providers,
+            "3": self._delete_provider,
+            "4": self._create_config,
+            "5": self._list_configs,
+            "6": self._set_default_config,
+            "7": self._delete_config,
+        }
+
         while True:
             choice = self.prompt_handler.show_menu()
 
             if choice.lower() == 'q':
                 self.prompt_handler.print_message("Goodbye!", "green")
                 sys.exit(0)
-            elif choice == "1":
-                self._add_provider()
-            elif choice == "2":
-                self._list_providers()
-            elif choice == "3":
-                self._delete_provider()
-            elif choice == "4":
-                self._create_config()
-            elif choice == "5":
-                self._list_configs()
-            elif choice == "6":
-                self._set_default_config()
-            elif choice == "7":
-                self._delete_config()
+
+            handler = dispatch.get(choice)
+            if handler:
+                handler()
 
     def _create_config(self) -> None:
         """Create a new configuration.
@@ -511,7 +525,7 @@ class ConfigTUI:
             return
 
         # Step 1: Select provider
-        provider_names = list(providers.keys())
+        provider_names = list(providers)
         selected_provider = self.prompt_handler.select_provider(provider_names)
 
         # Step 2: Select models for Haiku, Sonnet, and Opus
@@ -650,17 +664,17 @@ class ConfigTUI:
             elif api_key_type == "envvar":
                 actual_api_key = os.environ.get(api_key, '')
 
-            # Fetch models using the API key for authentication
+            # Fetch models using the API key for authentication (single round-trip)
             models_data = fetch_models(base_url, actual_api_key)
-            model_list = list_models(base_url, actual_api_key) if models_data else []
+            model_list = parse_model_names(models_data)
 
             if not model_list:
                 self.prompt_handler.print_message("No models found, not saving provider", "red")
                 self.prompt_handler.wait_for_continue()
                 return
 
-            # Add provider to config
-            success = self.config_manager.add_provider(name, base_url, api_key, api_key_type)
+            # Add provider to config, reusing the models fetched during validation
+            success = self.config_manager.add_provider(name, base_url, api_key, api_key_type, models=model_list)
             if success:
                 self.prompt_handler.print_message(
                     f"Provider '{name}' added successfully with {len(model_list)} models.", "green")
@@ -690,29 +704,32 @@ class ConfigTUI:
         if not providers:
             self.prompt_handler.print_message("No providers configured.", "yellow")
         else:
-            for name, provider in providers.items():
-                self.prompt_handler.print_message(f"{name}", "bold")
-                self.prompt_handler.print_message(f"  URL: {provider['base_url']}")
-
-                # Display API key info
-                api_key_type = provider.get('api_key_type', 'none')
-                if api_key_type == 'direct':
-                    self.prompt_handler.print_message("  API Key: [Direct Entry]")
-                elif api_key_type == 'envvar':
-                    env_var = provider.get('api_key', '')
-                    self.prompt_handler.print_message(f"  API Key: [Env Var: {env_var}]")
-                else:
-                    self.prompt_handler.print_message("  API Key: [None Required]")
-
-                self.prompt_handler.print_message(f"  Models: {len(provider['models'])}")
-                if provider['models']:
-                    # Show first 5 models
-                    models_to_show = provider['models'][:5]
-                    models_str = ", ".join(models_to_show)
-                    if len(provider['models']) > 5:
-                        models_str += f", ... ({len(provider['models']) - 5} more)"
-                    self.prompt_handler.print_message(f"  Available: {models_str}")
-                self.prompt_handler.print_message("")
+            # Buffer the listing so it is written to the terminal in one go
+            with self.console:
+                for name, provider in providers.items():
+                    self.prompt_handler.print_message(f"{name}", "bold")
+                    self.prompt_handler.print_message(f"  URL: {provider['base_url']}")
+
+                    # Display API key info
+                    api_key_type = provider.get('api_key_type', 'none')
+                    if api_key_type == 'direct':
+                        self.prompt_handler.print_message("  API Key: [Direct Entry]")
+                    elif api_key_type == 'envvar':
+                        env_var = provider.get('api_key', '')
+                        self.prompt_handler.print_message(f"  API Key: [Env Var: {env_var}]")
+                    else:
+                        self.prompt_handler.print_message("  API Key: [None Required]")
+
+                    models = provider['models']
+                    model_count = len(models)
+                    self.prompt_handler.print_message(f"  Models: {model_count}")
+                    if models:
+                        # Show first 5 models
+                        models_str = ", ".join(models[:5])
+                        if model_count > 5:
+                            models_str += f", ... ({model_count - 5} more)"
+                        self.prompt_handler.print_message(f"  Available: {models_str}")
+                    self.prompt_handler.print_message("")
 
         self.prompt_handler.wait_for_continue()
 
@@ -736,30 +753,28 @@ class ConfigTUI:
             self.prompt_handler.wait_for_continue()
             return
 
-        # List providers for selection
-        provider_names = list(providers.keys())
-        choice = self.prompt_handler.select_option(
-            "Enter provider number to delete (or 'q' to cancel)",
-            provider_names + ['q']
+        # List providers for selection, with a way back to the menu; deletion is still confirmed below
+        provider_name = self.prompt_handler.select_option(
+            "Select provider to delete",
+            [*providers, _BACK_CHOICE]
         )
 
-        if choice.lower() == 'q':
+        if provider_name == _BACK_CHOICE:
             return
 
-        provider_name = choice
-
         # Check for associated configurations
         associated_configs = self.config_manager.get_configs_for_provider(provider_name)
         if associated_configs:
             msg = f"Warning: Provider '{provider_name}' has "
             msg += f"{len(associated_configs)} associated configuration(s):"
-            self.prompt_handler.print_message(msg, "bold yellow")
+            with self.console:
+                self.prompt_handler.print_message(msg, "bold yellow")
 
-            for config_name in associated_configs:
-                is_default = " (*default)" if (
-                    config_name == self.config_manager.config.get('default_config')) else ""
-                self.prompt_handler.print_message(f"  - {config_name}{is_default}")
-            self.prompt_handler.print_message("These configurations will also be deleted.", "bold yellow")
+                for config_name in associated_configs:
+                    is_default = " (*default)" if (
+                        config_name == self.config_manager.config.get('default_config')) else ""
+                    self.prompt_handler.print_message(f"  - {config_name}{is_default}")
+                self.prompt_handler.print_message("These configurations will also be deleted.", "bold yellow")
 
             # Additional confirmation for configs
             confirm_msg = "Are you sure you want to delete the provider and all associated configurations? (y/N)"
@@ -813,7 +828,7 @@ class ConfigTUI:
             return
 
         # List available configurations
-        config_names = list(configs.keys())
+        config_names = list(configs)
         default_config = self.config_manager.config.get('default_config')
         selected_config = self.prompt_handler.select_config(config_names, default_config)
 
@@ -858,7 +873,7 @@ class ConfigTUI:
             return
 
         # List configurations for selection
-        config_names = list(configs.keys())
+        config_names = list(configs)
         default_config = self.config_manager.config.get('default_config')
         config_name = self.prompt_handler.select_config(config_names, default_config)
 
@@ -901,7 +916,7 @@ class ConfigTUI:
         if configs:
             if len(configs) == 1:
                 # Automatically set the only available config as default
-                config_name = list(configs.keys())[0]
+                config_name = next(iter(configs))
                 self.config_manager.set_default_config(config_name)
                 self.prompt_handler.print_message(
                     f"Configuration '{config_name}' automatically set as default.", "green")
@@ -1,8 +1,28 @@
 """Utility functions for configuration management."""
 
-import re
+import string
+from functools import lru_cache
+from typing import Dict, Optional
 
+# Model types that can be configured, in display order
+MODEL_TYPES = ('haiku', 'sonnet', 'opus')
 
+
+class _ConfigNameTable(Dict[int, Optional[int]]):
+    """str.translate table that drops any code point without an explicit mapping."""
+
+    def __missing__(self, key: int) -> None:
+        return None
+
+
+# Keep a-z, 0-9 and dashes, turn spaces and underscores into dashes, and drop
+# everything else (including non-ASCII) in a single translate pass
+_CONFIG_NAME_TABLE = _ConfigNameTable({ord(c): ord(c) for c in string.ascii_lowercase + string.digits + '-'})
+_CONFIG_NAME_TABLE[ord(' ')] = ord('-')
+_CONFIG_NAME_TABLE[ord('_')] = ord('-')
+
+
+@lru_cache(maxsize=256)
 def normalize_config_name(name: str) -> str:
     """
     Normalize a configuration name according to specified rules.
@@ -18,19 +38,8 @@ def normalize_config_name(name: str) -> str:
     :return: The normalized configuration name
     :rtype: str
     """
-    # Convert to lowercase
-    normalized = name.lower()
-
-    # Replace spaces and underscores with dashes
-    normalized = normalized.replace(' ', '-').replace('_', '-')
-
-    # Remove any characters that are not alphanumeric or dash
-    normalized = re.sub(r'[^a-z0-9\-]', '', normalized)
-
-    # Remove leading/trailing dashes
-    normalized = normalized.strip('-')
-
-    # Replace multiple consecutive dashes with a single dash
-    normalized = re.sub(r'-+', '-', normalized)
+    # Lowercase, map spaces/underscores to dashes and remove invalid characters
+    normalized = name.lower().translate(_CONFIG_NAME_TABLE)
 
-    return normalized
+    # Collapse runs of dashes and drop leading/trailing ones in a single split/join pass
+    return '-'.join(part for part in normalized.split('-') if part)
@@ -1,11 +1,50 @@
 """Display utilities for Claude Code Interceptor."""
 
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
 
-from rich.console import Console
-from rich.table import Table
+from cci.utils.config_utils import MODEL_TYPES
 
-from cci.config import ConfigManager
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from cci.config import ConfigManager
+
+_DEFAULT_MARK = "[bold green]✓[/bold green]"
+
+# Upper bound on providers queried at once
+_MAX_FETCH_WORKERS = 8
+
+
+@lru_cache(maxsize=1)
+def _get_console() -> "Console":
+    """
+    Get the shared console, creating it on first use so terminal detection runs once.
+
+    Rich is imported here rather than at module level so commands that never print
+    through the console (such as --cci-version) don't pay for importing it.
+
+    :return: Shared Rich console
+    :rtype: Console
+    """
+    from rich.console import Console
+
+    return Console()
+
+
+@lru_cache(maxsize=1)
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared pool for concurrent provider lookups, creating it on first use.
+
+    The pool outlives each table render so its worker threads, and the per-thread
+    HTTP sessions they hold, keep their pooled connections between calls.
+
+    :return: Shared thread pool
+    :rtype: ThreadPoolExecutor
+    """
+    return ThreadPoolExecutor(max_workers=_MAX_FETCH_WORKERS, thread_name_prefix='cci-models')
 
 
 def display_env_vars_and_command(env_vars: Dict[str, str], command_args: List[str]) -> None:
@@ -17,7 +56,7 @@ def display_env_vars_and_command(env_vars: Dict[str, str], command_args: List[st
     :param command_args: List of command arguments
     :type command_args: List[str]
     """
-    console = Console()
+    console = _get_console()
 
     if env_vars:
         console.print("[bold blue]Environment Variables:[/bold blue]")
@@ -35,14 +74,14 @@ def display_env_vars_and_command(env_vars: Dict[str, str], command_args: List[st
         console.print("  claude")
 
 
-def _format_model_name(model_name: Optional[str], live_models: Optional[List[str]]) -> str:
+def _format_model_name(model_name: Optional[str], live_models: Optional[Set[str]]) -> str:
     """
     Format model name with color (red if stale, yellow if unverified, green if valid).
 
     :param model_name: The model name to format
     :type model_name: Optional[str]
-    :param live_models: List of live model names, or None if unavailable
-    :type live_models: Optional[List[str]]
+    :param live_models: Set of live model names, or None if unavailable
+    :type live_models: Optional[Set[str]]
     :return: Formatted model name with Rich markup
     :rtype: str
     """
@@ -58,14 +97,42 @@ def _format_model_name(model_name: Optional[str], live_models: Optional[List[str
         return f"[red]{model_name}[/red]"  # Stale model
 
 
-def display_configs_table(config_manager: ConfigManager) -> None:
+def _prefetch_live_models(config_manager: "ConfigManager", provider_names: Set[str]) -> Dict[str, Optional[Set[str]]]:
+    """
+    Fetch live models for each provider, querying providers concurrently.
+
+    Each lookup is a network round-trip, so they run in parallel on a shared pool
+    whose threads keep their HTTP sessions between calls; results are stored as sets
+    for constant-time membership checks per model cell.
+
+    :param config_manager: Configuration manager instance
+    :type config_manager: ConfigManager
+    :param provider_names: Names of the providers to fetch
+    :type provider_names: Set[str]
+    :return: Live model names per provider, or None for providers whose fetch failed
+    :rtype: Dict[str, Optional[Set[str]]]
+    """
+    if not provider_names:
+        return {}
+
+    return {
+        provider_name: set(models) if models is not None else None
+        for provider_name, models in zip(
+            provider_names, _get_executor().map(config_manager.get_live_models_for_provider, provider_names))
+    }
+
+
+def display_configs_table(config_manager: "ConfigManager") -> None:
     """
     Display saved configurations in a table with stale model detection.
 
     :param config_manager: Configuration manager instance
     :type config_manager: ConfigManager
     """
-    console = Console()
+    # Imported here since only this command renders tables
+    from rich.table import Table
+
+    console = _get_console()
 
     configs = config_manager.config.get('configs', {})
 
@@ -73,8 +140,9 @@ def display_configs_table(config_manager: ConfigManager) -> None:
         console.print("[yellow]No saved configurations found.[/yellow]")
         return
 
-    # Cache live models per provider to avoid redundant API calls
-    provider_models_cache: Dict[str, Optional[List[str]]] = {}
+    # Fetch every provider's models up front so the row loop below is pure rendering
+    provider_models_cache = _prefetch_live_models(
+        config_manager, {config.get('provider', 'N/A') for config in configs.values()})
 
     table = Table(title="Saved Configurations")
     table.add_column("Name", style="cyan", no_wrap=True)
@@ -86,45 +154,28 @@ def display_configs_table(config_manager: ConfigManager) -> None:
 
     default_config = config_manager.config.get('default_config')
 
+    add_row = table.add_row
     for name, config in configs.items():
         provider_name = config.get('provider', 'N/A')
-
-        # Get live models for this provider (use cache if available)
-        if provider_name not in provider_models_cache:
-            provider_models_cache[provider_name] = config_manager.get_live_models_for_provider(provider_name)
-
         live_models = provider_models_cache[provider_name]
 
         # Format model names with color based on validity
-        haiku_model = _format_model_name(
-            config.get('models', {}).get('haiku'),
-            live_models
-        )
-        sonnet_model = _format_model_name(
-            config.get('models', {}).get('sonnet'),
-            live_models
-        )
-        opus_model = _format_model_name(
-            config.get('models', {}).get('opus'),
-            live_models
-        )
-
-        is_default = "[bold green]✓[/bold green]" if name == default_config else ""
-        table.add_row(
+        models = config.get('models', {})
+        add_row(
             name,
             provider_name,
-            haiku_model,
-            sonnet_model,
-            opus_model,
-            is_default
+            *(_format_model_name(models.get(model_type), live_models) for model_type in MODEL_TYPES),
+            _DEFAULT_MARK if name == default_config else ""
         )
 
-    console.print(table)
-
-    # Show legend if any API calls failed
-    if None in provider_models_cache.values():
-        console.print(
-            "\n[bold]Legend:[/bold] [green]✓ Valid[/green] | "
-            "[yellow]⚠ Unverified (API unavailable)[/yellow] | "
-            "[red]✗ Stale[/red]"
-        )
+    # Buffer the table and legend so they are written to the terminal together
+    with console:
+        console.print(table)
+
+        # Show legend if any API calls failed
+        if None in provider_models_cache.values():
+            console.print(
+                "\n[bold]Legend:[/bold] [green]✓ Valid[/green] | "
+                "[yellow]⚠ Unverified (API unavailable)[/yellow] | "
+                "[red]✗ Stale[/red]"
+            )
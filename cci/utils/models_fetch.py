@@ -1,10 +1,72 @@
 """Utility functions for fetching models from API endpoints."""
 
-from typing import Dict, List, Optional
-from urllib.parse import urljoin, urlparse
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+# Per-thread sessions: requests doesn't guarantee a Session is thread-safe, and providers are
+# fetched concurrently. Repeated requests from the same thread (the main thread, or a worker of
+# the long-lived pool in cci.utils.display) reuse that session's keep-alive connections.
+_thread_local = threading.local()
+
+# Discovery only needs a status code; HEAD avoids downloading the model list
+_PROBE_TIMEOUT = 2
+_FETCH_TIMEOUT = 10
+
+# Model list responses larger than this are treated as a failed fetch rather than loaded into memory
+_MAX_RESPONSE_BYTES = 5_000_000
+_READ_CHUNK_SIZE = 65536
+
+# Status codes from servers that don't implement HEAD on the models route
+_HEAD_UNSUPPORTED = (405, 501)
+
+# Models endpoint paths to probe, in order of preference
+_MODELS_PATHS = ('/v1/models', '/models')
+
+# Successful model lists keyed by (base_url, api_key), kept for the lifetime of the process
+_models_cache: Dict[Tuple[str, Optional[str]], List[str]] = {}
+
+# Discovered endpoints keyed by (base_url, api_key) as (monotonic time, endpoint).
+# Found endpoints are kept; failed discoveries are re-probed after the TTL.
+_endpoint_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Optional[str]]] = {}
+_FAILED_DISCOVERY_TTL = 30.0
+
+# Guards both caches; held only around cache reads and writes, never across a request
+_cache_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Get the calling thread's session, creating it on first use.
+
+    :return: Session for the current thread
+    :rtype: requests.Session
+    """
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+
+def _auth_headers(api_key: Optional[str]) -> Dict[str, str]:
+    """
+    Build request headers for the given API key.
+
+    :param api_key: Optional API key for authentication
+    :type api_key: Optional[str]
+    :return: Request headers
+    :rtype: Dict[str, str]
+    """
+    headers = {}
+    if api_key:
+        # Send both headers for compatibility with different providers
+        headers['Authorization'] = f'Bearer {api_key}'
+        headers['x-api-key'] = api_key
+    return headers
+
 
 def normalize_base_url(base_url: str) -> str:
     """
@@ -18,22 +80,40 @@ def normalize_base_url(base_url: str) -> str:
     # Remove trailing slashes
     base_url = base_url.rstrip('/')
 
-    # Parse the URL to check if it ends with /v1 or /v1/
-    parsed = urlparse(base_url)
-    path = parsed.path
-
-    # If the path ends with /v1, remove it to get the true base URL
-    if path.endswith('/v1'):
-        # Remove /v1 from the end
-        base_path = path[:-3]  # Remove '/v1'
-        # Reconstruct URL without /v1
-        normalized = parsed._replace(path=base_path).geturl()
-        return normalized.rstrip('/')
+    # If the path ends with /v1, remove it to get the true base URL (plain string
+    # slicing; the '/' check keeps a bare host named "v1" intact)
+    if base_url.endswith('/v1') and not base_url[:-3].endswith('/'):
+        return base_url[:-3].rstrip('/')
 
     return base_url
 
 
 def discover_models_endpoint(base_url: str, api_key: Optional[str] = None) -> Optional[str]:
+    """
+    Discover the models endpoint, reusing earlier results for the same base URL and API key.
+
+    :param base_url: The base URL to test
+    :type base_url: str
+    :param api_key: Optional API key for authentication
+    :type api_key: Optional[str]
+    :return: The working models endpoint URL or None if not found
+    :rtype: Optional[str]
+    """
+    cache_key = (base_url, api_key)
+    with _cache_lock:
+        cached = _endpoint_cache.get(cache_key)
+    if cached is not None:
+        checked_at, endpoint = cached
+        if endpoint is not None or time.monotonic() - checked_at < _FAILED_DISCOVERY_TTL:
+            return endpoint
+
+    endpoint = _probe_models_endpoint(base_url, api_key)
+    with _cache_lock:
+        _endpoint_cache[cache_key] = (time.monotonic(), endpoint)
+    return endpoint
+
+
+def _probe_models_endpoint(base_url: str, api_key: Optional[str] = None) -> Optional[str]:
     """
     Discover the models endpoint by trying different paths.
 
@@ -47,23 +127,26 @@ def discover_models_endpoint(base_url: str, api_key: Optional[str] = None) -> Op
     # Normalize the base URL first
     normalized_base = normalize_base_url(base_url)
 
-    # Prepare headers with API key if provided
-    headers = {}
-    if api_key:
-        # Send both headers for compatibility with different providers
-        headers['Authorization'] = f'Bearer {api_key}'
-        headers['x-api-key'] = api_key
+    headers = _auth_headers(api_key)
+    session = _get_session()
 
-    # Test paths in order of preference
-    test_paths = [
-        '/v1/models',
-        '/models'
-    ]
+    for endpoint_url in (f"{normalized_base}{path}" for path in _MODELS_PATHS):
+        try:
+            response = session.head(endpoint_url, headers=headers, timeout=_PROBE_TIMEOUT, allow_redirects=True)
+            if response.status_code == 200:
+                return endpoint_url
+            # Any other answer besides "HEAD not supported" is authoritative for this path
+            if response.status_code not in _HEAD_UNSUPPORTED:
+                continue
+        except requests.ReadTimeout:
+            # Connected but slow to answer (such as a cold local inference server); retry with the longer GET
+            pass
+        except requests.RequestException:
+            # Unreachable paths fail the same way for GET, so move straight on
+            continue
 
-    for path in test_paths:
-        endpoint_url = urljoin(normalized_base + '/', path.lstrip('/'))
         try:
-            response = requests.get(endpoint_url, headers=headers, timeout=10)
+            response = session.get(endpoint_url, headers=headers, timeout=_FETCH_TIMEOUT)
             # Check if the response is successful
             if response.status_code == 200:
                 return endpoint_url
@@ -91,60 +174,92 @@ def fetch_models(base_url: str, api_key: Optional[str] = None) -> Optional[Dict]
     if not models_endpoint:
         return None
 
-    # Prepare headers with API key if provided
-    headers = {}
-    if api_key:
-        # Send both headers for compatibility with different providers
-        headers['Authorization'] = f'Bearer {api_key}'
-        headers['x-api-key'] = api_key
-
     try:
-        response = requests.get(models_endpoint, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException:
+        response = _get_session().get(
+            models_endpoint, headers=_auth_headers(api_key), timeout=_FETCH_TIMEOUT, stream=True)
+        try:
+            response.raise_for_status()
+
+            # Read the body incrementally so an oversized response is abandoned early
+            chunks = []
+            total = 0
+            for chunk in response.iter_content(_READ_CHUNK_SIZE):
+                total += len(chunk)
+                if total > _MAX_RESPONSE_BYTES:
+                    return None
+                chunks.append(chunk)
+        finally:
+            response.close()
+        return json.loads(b''.join(chunks))
+    except (requests.RequestException, ValueError):
         return None
 
 
-def list_models(base_url: str, api_key: Optional[str] = None) -> List[str]:
+def parse_model_names(models_data: Any) -> List[str]:
     """
-    List available models from the API endpoint.
+    Extract model names from an already-fetched models response.
 
-    :param base_url: The base URL of the API
-    :type base_url: str
-    :param api_key: Optional API key for authentication
-    :type api_key: Optional[str]
+    :param models_data: Parsed JSON response from a models endpoint
+    :type models_data: Any
     :return: List of model names
     :rtype: List[str]
     """
-    models_data = fetch_models(base_url, api_key)
-
     if not models_data:
         return []
 
-    # Extract model names based on common API response formats
-    model_names = []
-
-    # Handle OpenAI-like response format
-    if 'data' in models_data and isinstance(models_data['data'], list):
-        for model in models_data['data']:
-            if isinstance(model, dict) and 'id' in model:
-                model_names.append(model['id'])
+    # Handle OpenAI-like response format first since it is by far the most common
+    if isinstance(models_data, dict):
+        data = models_data.get('data')
+        if isinstance(data, list):
+            return [model['id'] for model in data if isinstance(model, dict) and 'id' in model]
 
-    # Handle other common formats
-    elif 'models' in models_data and isinstance(models_data['models'], list):
-        for model in models_data['models']:
-            if isinstance(model, dict) and 'id' in model:
-                model_names.append(model['id'])
-            elif isinstance(model, str):
-                model_names.append(model)
+        # Handle other common formats
+        entries = models_data.get('models')
+        if not isinstance(entries, list):
+            return []
 
     # Handle simple list format
     elif isinstance(models_data, list):
-        for model in models_data:
-            if isinstance(model, dict) and 'id' in model:
-                model_names.append(model['id'])
-            elif isinstance(model, str):
-                model_names.append(model)
+        entries = models_data
+    else:
+        return []
+
+    return [
+        model if isinstance(model, str) else model['id']
+        for model in entries
+        if isinstance(model, str) or (isinstance(model, dict) and 'id' in model)
+    ]
+
+
+def list_models(base_url: str, api_key: Optional[str] = None) -> List[str]:
+    """
+    List available models from the API endpoint.
+
+    Results are memoized per base URL and API key for the rest of the process;
+    use clear_models_cache() to force a refetch.
+
+    :param base_url: The base URL of the API
+    :type base_url: str
+    :param api_key: Optional API key for authentication
+    :type api_key: Optional[str]
+    :return: List of model names
+    :rtype: List[str]
+    """
+    # Only successful lookups are cached so a transient failure is retried next time
+    cache_key = (base_url, api_key)
+    with _cache_lock:
+        cached = _models_cache.get(cache_key)
+    if cached is None:
+        cached = parse_model_names(fetch_models(base_url, api_key))
+        if not cached:
+            return []
+        with _cache_lock:
+            _models_cache[cache_key] = cached
+    return list(cached)
+
 
-    return model_names
+def clear_models_cache() -> None:
+    """Forget all cached model lists and discovered endpoints so the next lookup hits the API."""
+    with _cache_lock:
+        _models_cache.clear()
+        _endpoint_cache.clear()
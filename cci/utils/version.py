@@ -1,13 +1,17 @@
 """Utility functions for reading project version information."""
 
+from functools import lru_cache
 from importlib.metadata import PackageNotFoundError, version
 from typing import Optional
 
 
+@lru_cache(maxsize=1)
 def get_project_version() -> Optional[str]:
     """
     Read the project version from installed package metadata.
 
+    The result is cached since package metadata does not change at runtime.
+
     :return: The project version as a string, or None if not found
     :rtype: Optional[str]
     """
@@ -0,0 +1,28 @@
+"""Shared pytest fixtures."""
+
+import sys
+
+import pytest
+
+
+def _clear_config_manager_cache():
+    """Clear the shared config manager if cci.config has been imported; otherwise there is nothing cached."""
+    config = sys.modules.get('cci.config')
+    if config is not None:
+        config._get_config_manager.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_config_manager_cache():
+    """Clear the shared config manager so each test starts from a fresh instance."""
+    # Looked up rather than imported so test modules that never touch cci.config (such as
+    # test_version) don't pay for importing it and requests
+    _clear_config_manager_cache()
+    yield
+    _clear_config_manager_cache()
+
+
+@pytest.fixture(autouse=True)
+def no_subprocess(mocker):
+    """Fail any test that would really spawn a process, such as launching claude, without patching it first."""
+    return mocker.patch('subprocess.run', side_effect=AssertionError("unexpected subprocess.run call"))
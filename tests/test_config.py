@@ -1,7 +1,7 @@
 """Tests for the configuration management module."""
 
 import json
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -23,6 +23,13 @@ class TestConfigManager:
         """Create a ConfigManager instance with a temporary directory."""
         return ConfigManager(str(temp_config_dir))
 
+    @pytest.fixture
+    def mock_list_models(self, monkeypatch):
+        """Replace the network-backed list_models used by ConfigManager with a Mock."""
+        mock_list = Mock()
+        monkeypatch.setattr("cci.config.list_models", mock_list)
+        return mock_list
+
     def test_init_with_default_directory(self, tmp_path):
         """Test initialization with default directory."""
         # Create a mock home directory structure
@@ -42,13 +49,13 @@ class TestConfigManager:
         assert cm.config_dir == temp_config_dir
         assert cm.config_file == temp_config_dir / "config.json"
 
-    def test_load_config_creates_directories(self, temp_config_dir):
-        """Test that _load_config creates directories if they don't exist."""
+    def test_init_creates_directories(self, temp_config_dir):
+        """Test that the config directories are created if they don't exist."""
         # Create a nested directory path
         nested_dir = temp_config_dir / "nested" / "config"
-        cm = ConfigManager(str(nested_dir))
 
         # This should create the directories
+        cm = ConfigManager(str(nested_dir))
         config = cm._load_config()
 
         # Check that directories were created
@@ -56,6 +63,16 @@ class TestConfigManager:
         assert isinstance(config, dict)
         assert "providers" in config
 
+    def test_config_loaded_lazily(self, temp_config_dir):
+        """Test that the config file is only read on first access to config."""
+        with patch.object(ConfigManager, "_load_config", return_value={"providers": {}}) as mock_load:
+            cm = ConfigManager(str(temp_config_dir))
+            mock_load.assert_not_called()
+
+            assert cm.config == {"providers": {}}
+            assert cm.config == {"providers": {}}
+            mock_load.assert_called_once()
+
     def test_load_config_returns_default_when_no_file(self, temp_config_dir):
         """Test that _load_config returns default config when no file exists."""
         cm = ConfigManager(str(temp_config_dir))
@@ -126,36 +143,110 @@ class TestConfigManager:
 
         assert saved_config["providers"]["test"]["base_url"] == "http://test.com"
 
-    def test_add_provider_success(self, config_manager):
+    def test_save_config_leaves_no_temp_files(self, config_manager):
+        """Test that save_config replaces config.json without leaving temporary files."""
+        config_manager.save_config()
+        config_manager.save_config()
+
+        assert [p.name for p in config_manager.config_dir.iterdir()] == ["config.json"]
+
+    def test_save_config_failure_keeps_existing_file(self, config_manager):
+        """Test that a failed save leaves the previous config.json intact."""
+        config_manager.save_config()
+        original = config_manager.config_file.read_bytes()
+
+        config_manager.config["providers"]["test"] = {"base_url": "http://test.com"}
+        with patch("cci.config.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                config_manager.save_config()
+
+        assert config_manager.config_file.read_bytes() == original
+        assert [p.name for p in config_manager.config_dir.iterdir()] == ["config.json"]
+
+    def test_batch_defers_save_until_exit(self, config_manager):
+        """Test that saves inside a with block are written once when the outermost block exits."""
+        with patch.object(config_manager, "_write_config") as mock_write:
+            with config_manager:
+                config_manager.set_model("haiku", "model1")
+                with config_manager:
+                    config_manager.set_model("sonnet", "model2")
+                mock_write.assert_not_called()
+
+            mock_write.assert_called_once()
+
+            # Outside a batch, saves are written immediately again
+            config_manager.set_model("opus", "model3")
+            assert mock_write.call_count == 2
+
+    def test_batch_not_saved_when_block_raises(self, config_manager):
+        """Test that a batch interrupted by an exception is rolled back rather than written."""
+        config_manager.set_model("haiku", "model1")
+
+        with patch.object(config_manager, "_write_config") as mock_write:
+            with pytest.raises(RuntimeError):
+                with config_manager:
+                    config_manager.set_model("sonnet", "model2")
+                    raise RuntimeError("interrupted")
+
+            mock_write.assert_not_called()
+
+        # A later save must not persist the abandoned change
+        config_manager.save_config()
+        saved = ConfigManager(str(config_manager.config_dir)).config
+        assert saved["models"]["haiku"] == "model1"
+        assert saved["models"]["sonnet"] is None
+
+    def test_batch_without_changes_does_not_save(self, config_manager):
+        """Test that a batch with no saves doesn't write the config."""
+        with config_manager:
+            pass
+
+        assert not config_manager.config_file.exists()
+
+    def test_save_and_load_config_without_orjson(self, config_manager):
+        """Test that the stdlib json fallback round-trips the config when orjson is unavailable."""
+        config_manager.config["providers"]["test"] = {"base_url": "http://test.com", "models": ["model1"]}
+
+        with patch("cci.config.orjson", None):
+            config_manager.save_config()
+            loaded = config_manager._load_config()
+
+        assert loaded == config_manager.config
+
+    def test_add_provider_success(self, config_manager, mock_list_models):
         """Test successful addition of a provider."""
-        with patch("cci.config.fetch_models") as mock_fetch, \
-                patch("cci.config.list_models") as mock_list:
+        # Mock the API response
+        mock_list_models.return_value = ["model1", "model2"]
+
+        # Add provider
+        result = config_manager.add_provider("test-provider", "http://test.com/v1")
 
-            # Mock the API responses
-            mock_fetch.return_value = {"data": [{"id": "model1"}, {"id": "model2"}]}
-            mock_list.return_value = ["model1", "model2"]
+        # Check results
+        assert result is True
+        mock_list_models.assert_called_once_with("http://test.com/v1", "")
+        assert "test-provider" in config_manager.config["providers"]
+        assert config_manager.config["providers"]["test-provider"]["base_url"] == "http://test.com/v1"
+        assert config_manager.config["providers"]["test-provider"]["models"] == ["model1", "model2"]
 
-            # Add provider
-            result = config_manager.add_provider("test-provider", "http://test.com/v1")
+    def test_add_provider_with_prefetched_models(self, config_manager, mock_list_models):
+        """Test that add_provider skips fetching when models are supplied."""
+        result = config_manager.add_provider("test-provider", "http://test.com/v1", models=["model1"])
 
-            # Check results
-            assert result is True
-            assert "test-provider" in config_manager.config["providers"]
-            assert config_manager.config["providers"]["test-provider"]["base_url"] == "http://test.com/v1"
-            assert config_manager.config["providers"]["test-provider"]["models"] == ["model1", "model2"]
+        assert result is True
+        mock_list_models.assert_not_called()
+        assert config_manager.config["providers"]["test-provider"]["models"] == ["model1"]
 
-    def test_add_provider_failure(self, config_manager):
+    def test_add_provider_failure(self, config_manager, mock_list_models):
         """Test failure when adding a provider."""
-        with patch("cci.config.fetch_models") as mock_fetch:
-            # Mock an exception
-            mock_fetch.side_effect = Exception("Connection failed")
+        # Mock an exception
+        mock_list_models.side_effect = Exception("Connection failed")
 
-            # Try to add provider
-            result = config_manager.add_provider("test-provider", "http://test.com/v1")
+        # Try to add provider
+        result = config_manager.add_provider("test-provider", "http://test.com/v1")
 
-            # Check results
-            assert result is False
-            assert "test-provider" not in config_manager.config["providers"]
+        # Check results
+        assert result is False
+        assert "test-provider" not in config_manager.config["providers"]
 
     def test_remove_provider(self, config_manager):
         """Test removal of a provider."""
@@ -180,6 +271,20 @@ class TestConfigManager:
         assert "test-config" not in config_manager.config["configs"]
         assert config_manager.config["default_config"] is None
 
+    def test_remove_provider_writes_config_once(self, config_manager):
+        """Test that removing a provider and promoting the remaining config is a single write."""
+        config_manager.config["providers"]["provider1"] = {"base_url": "http://one.com", "models": []}
+        config_manager.config["providers"]["provider2"] = {"base_url": "http://two.com", "models": []}
+        config_manager.config["configs"]["config1"] = {"provider": "provider1", "models": {}}
+        config_manager.config["configs"]["config2"] = {"provider": "provider2", "models": {}}
+        config_manager.config["default_config"] = "config1"
+
+        with patch.object(config_manager, "_write_config") as mock_write:
+            config_manager.remove_provider("provider1")
+
+        mock_write.assert_called_once()
+        assert config_manager.config["default_config"] == "config2"
+
     def test_remove_config_success(self, config_manager):
         """Test successful removal of a configuration."""
         # Add a config
@@ -242,7 +347,7 @@ class TestConfigManager:
         assert result is False
         assert config_manager.config["default_config"] is None
 
-    def test_update_provider_success(self, config_manager):
+    def test_update_provider_success(self, config_manager, mock_list_models):
         """Test successful update of provider models."""
         # Add a provider first
         config_manager.config["providers"]["test-provider"] = {
@@ -250,23 +355,22 @@ class TestConfigManager:
             "models": ["old-model"]
         }
 
-        with patch("cci.config.list_models") as mock_list:
-            # Mock the API response
-            mock_list.return_value = ["new-model1", "new-model2"]
+        # Mock the API response
+        mock_list_models.return_value = ["new-model1", "new-model2"]
 
-            # Update the provider
-            result = config_manager.update_provider("test-provider")
+        # Update the provider
+        result = config_manager.update_provider("test-provider")
 
-            # Check results
-            assert result is True
-            assert config_manager.config["providers"]["test-provider"]["models"] == ["new-model1", "new-model2"]
+        # Check results
+        assert result is True
+        assert config_manager.config["providers"]["test-provider"]["models"] == ["new-model1", "new-model2"]
 
     def test_update_provider_not_found(self, config_manager):
         """Test update of non-existent provider."""
         result = config_manager.update_provider("non-existent")
         assert result is False
 
-    def test_update_provider_failure(self, config_manager):
+    def test_update_provider_failure(self, config_manager, mock_list_models):
         """Test failure when updating provider."""
         # Add a provider first
         config_manager.config["providers"]["test-provider"] = {
@@ -274,15 +378,15 @@ class TestConfigManager:
             "models": ["old-model"]
         }
 
-        with patch("cci.config.list_models") as mock_list:
-            # Mock an exception
-            mock_list.side_effect = Exception("Connection failed")
+        # Mock an exception
+        mock_list_models.side_effect = Exception("Connection failed")
 
-            # Try to update the provider
-            result = config_manager.update_provider("test-provider")
+        # Try to update the provider
+        result = config_manager.update_provider("test-provider")
 
-            # Check results
-            assert result is False
+        # Check results
+        assert result is False
+        assert config_manager.config["providers"]["test-provider"]["models"] == ["old-model"]
 
     def test_get_configs_for_provider(self, config_manager):
         """Test getting configurations for a specific provider."""
@@ -409,167 +513,67 @@ class TestConfigManager:
         config_manager.set_default_config("test-config")
         assert config_manager.config["default_config"] == "test-config"
 
-    def test_get_environment_variables_with_provider(self, config_manager):
-        """Test getting environment variables with a specific provider."""
-        # Create a config dictionary as the method now expects
-        config = {
-            "base_url": "http://test.com/v1",
-            "models": {
-                "haiku": "test-haiku",
-                "sonnet": "test-sonnet",
-                "opus": "test-opus"
-            },
-            "api_key": "",
-            "api_key_type": "none"
-        }
-
-        env_vars = config_manager.get_environment_variables(config)
-
-        # Check results
-        assert env_vars["ANTHROPIC_BASE_URL"] == "http://test.com/v1"
-        assert env_vars["ANTHROPIC_API_KEY"] == ""
-        assert env_vars["ANTHROPIC_AUTH_TOKEN"] == ""
-        assert env_vars["ANTHROPIC_DEFAULT_HAIKU_MODEL"] == "test-haiku"
-        assert env_vars["ANTHROPIC_DEFAULT_SONNET_MODEL"] == "test-sonnet"
-        assert env_vars["ANTHROPIC_DEFAULT_OPUS_MODEL"] == "test-opus"
-
-    def test_get_environment_variables_without_provider(self, config_manager):
-        """Test getting environment variables without specifying a provider."""
-        # Create a config dictionary with minimal information
+    @pytest.mark.parametrize("base_url, models, api_key, api_key_type, expected_api_key", [
+        # Provider with all models and no API key
+        ("http://test.com/v1", ("test-haiku", "test-sonnet", "test-opus"), "", "none", ""),
+        # No base URL and only some models set
+        (None, ("test-haiku", None, None), "", "none", ""),
+        # No base URL and no models set
+        (None, (None, None, None), "", "none", ""),
+        # API key entered directly
+        ("http://test.com/v1", ("test-haiku", "test-sonnet", "test-opus"), "test-api-key", "direct", "test-api-key"),
+        # API key read from an environment variable
+        ("http://test.com/v1", ("test-haiku", "test-sonnet", "test-opus"), "TEST_API_KEY_VAR", "envvar",
+         "actual-api-key-from-env"),
+        # Environment variable for the API key is not set
+        ("http://test.com/v1", ("test-haiku", "test-sonnet", "test-opus"), "MISSING_API_KEY_VAR", "envvar", ""),
+    ])
+    def test_get_environment_variables(self, config_manager, monkeypatch, base_url, models, api_key, api_key_type,
+                                       expected_api_key):
+        """Test getting environment variables for different provider and API key setups."""
+        monkeypatch.setenv("TEST_API_KEY_VAR", "actual-api-key-from-env")
+        monkeypatch.delenv("MISSING_API_KEY_VAR", raising=False)
+
+        haiku, sonnet, opus = models
         config = {
-            "base_url": None,  # No base URL
-            "models": {
-                "haiku": "test-haiku",
-                "sonnet": None,
-                "opus": None
-            },
-            "api_key": "",
-            "api_key_type": "none"
+            "base_url": base_url,
+            "models": {"haiku": haiku, "sonnet": sonnet, "opus": opus},
+            "api_key": api_key,
+            "api_key_type": api_key_type
         }
 
         env_vars = config_manager.get_environment_variables(config)
 
-        # Check results
-        assert env_vars["ANTHROPIC_BASE_URL"] is None
-        assert env_vars["ANTHROPIC_API_KEY"] == ""
-        assert env_vars["ANTHROPIC_DEFAULT_HAIKU_MODEL"] == "test-haiku"
-        assert env_vars["ANTHROPIC_DEFAULT_SONNET_MODEL"] is None
-        assert env_vars["ANTHROPIC_DEFAULT_OPUS_MODEL"] is None
-
-    def test_get_environment_variables_nonexistent_provider(self, config_manager):
-        """Test getting environment variables with non-existent provider."""
-        # Create a config dictionary with minimal information
-        config = {
-            "base_url": None,
-            "models": {
-                "haiku": None,
-                "sonnet": None,
-                "opus": None
-            },
-            "api_key": "",
-            "api_key_type": "none"
-        }
-
-        env_vars = config_manager.get_environment_variables(config)
-
-        # Should not have base URL but might have model vars
-        assert env_vars["ANTHROPIC_BASE_URL"] is None
-        assert env_vars["ANTHROPIC_API_KEY"] == ""
-
-    def test_get_environment_variables_with_direct_api_key(self, config_manager):
-        """Test getting environment variables with a direct API key."""
-        # Create a config dictionary with a direct API key
-        config = {
-            "base_url": "http://test.com/v1",
-            "models": {
-                "haiku": "test-haiku",
-                "sonnet": "test-sonnet",
-                "opus": "test-opus"
-            },
-            "api_key": "test-api-key",
-            "api_key_type": "direct"
+        assert env_vars == {
+            "ANTHROPIC_DEFAULT_HAIKU_MODEL": haiku,
+            "ANTHROPIC_DEFAULT_SONNET_MODEL": sonnet,
+            "ANTHROPIC_DEFAULT_OPUS_MODEL": opus,
+            "ANTHROPIC_BASE_URL": base_url,
+            "ANTHROPIC_API_KEY": expected_api_key,
+            "ANTHROPIC_AUTH_TOKEN": ""
         }
 
-        env_vars = config_manager.get_environment_variables(config)
 
-        # Check results
-        assert env_vars["ANTHROPIC_BASE_URL"] == "http://test.com/v1"
-        assert env_vars["ANTHROPIC_API_KEY"] == "test-api-key"
-        assert env_vars["ANTHROPIC_DEFAULT_HAIKU_MODEL"] == "test-haiku"
-        assert env_vars["ANTHROPIC_DEFAULT_SONNET_MODEL"] == "test-sonnet"
-        assert env_vars["ANTHROPIC_DEFAULT_OPUS_MODEL"] == "test-opus"
-
-    def test_get_environment_variables_with_envvar_api_key(self, config_manager):
-        """Test getting environment variables with an environment variable API key."""
-        # Create a config dictionary with an environment variable API key
-        config = {
-            "base_url": "http://test.com/v1",
-            "models": {
-                "haiku": "test-haiku",
-                "sonnet": "test-sonnet",
-                "opus": "test-opus"
-            },
-            "api_key": "TEST_API_KEY_VAR",
-            "api_key_type": "envvar"
-        }
-
-        # Mock the environment variable
-        import os
-        original_value = os.environ.get("TEST_API_KEY_VAR")
-        os.environ["TEST_API_KEY_VAR"] = "actual-api-key-from-env"
-
-        try:
-            env_vars = config_manager.get_environment_variables(config)
-
-            # Check results
-            assert env_vars["ANTHROPIC_BASE_URL"] == "http://test.com/v1"
-            assert env_vars["ANTHROPIC_API_KEY"] == "actual-api-key-from-env"
-            assert env_vars["ANTHROPIC_DEFAULT_HAIKU_MODEL"] == "test-haiku"
-            assert env_vars["ANTHROPIC_DEFAULT_SONNET_MODEL"] == "test-sonnet"
-            assert env_vars["ANTHROPIC_DEFAULT_OPUS_MODEL"] == "test-opus"
-        finally:
-            # Restore original environment
-            if original_value is not None:
-                os.environ["TEST_API_KEY_VAR"] = original_value
-            else:
-                os.environ.pop("TEST_API_KEY_VAR", None)
-
-    def test_get_environment_variables_with_missing_envvar_api_key(self, config_manager):
-        """Test getting environment variables with a missing environment variable API key."""
-        # Create a config dictionary with a missing environment variable API key
-        config = {
-            "base_url": "http://test.com/v1",
-            "models": {
-                "haiku": "test-haiku",
-                "sonnet": "test-sonnet",
-                "opus": "test-opus"
-            },
-            "api_key": "MISSING_API_KEY_VAR",
-            "api_key_type": "envvar"
-        }
+def test_get_config_manager():
+    """Test the get_config_manager convenience function."""
+    cm = get_config_manager()
+    assert isinstance(cm, ConfigManager)
 
-        # Ensure the environment variable is not set
-        import os
-        original_value = os.environ.get("MISSING_API_KEY_VAR")
-        if original_value is not None:
-            del os.environ["MISSING_API_KEY_VAR"]
 
-        try:
-            env_vars = config_manager.get_environment_variables(config)
+def test_get_config_manager_reuses_instance(tmp_path):
+    """Test that get_config_manager returns one shared instance per directory."""
+    cm = get_config_manager(str(tmp_path))
+    assert get_config_manager(str(tmp_path)) is cm
+    assert get_config_manager(str(tmp_path / "other")) is not cm
 
-            # Check results - should be empty string since env var doesn't exist
-            assert env_vars["ANTHROPIC_BASE_URL"] == "http://test.com/v1"
-            assert env_vars["ANTHROPIC_API_KEY"] == ""
-            assert env_vars["ANTHROPIC_DEFAULT_HAIKU_MODEL"] == "test-haiku"
-            assert env_vars["ANTHROPIC_DEFAULT_SONNET_MODEL"] == "test-sonnet"
-            assert env_vars["ANTHROPIC_DEFAULT_OPUS_MODEL"] == "test-opus"
-        finally:
-            # Restore original environment
-            if original_value is not None:
-                os.environ["MISSING_API_KEY_VAR"] = original_value
 
+def test_get_config_manager_resolves_equivalent_paths(tmp_path, monkeypatch):
+    """Test that different spellings of the same directory share one instance."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
 
-def test_get_config_manager():
-    """Test the get_config_manager convenience function."""
     cm = get_config_manager()
-    assert isinstance(cm, ConfigManager)
+    assert get_config_manager(None) is cm
+    assert get_config_manager("~/.config/cci") is cm
+    assert get_config_manager(".config/cci") is cm
+    assert get_config_manager(str(tmp_path / ".config" / "other" / ".." / "cci")) is cm
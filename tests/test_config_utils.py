@@ -43,3 +43,6 @@ def test_normalize_config_name():
 
     # Test only dashes
     assert normalize_config_name("---") == ""
+
+    # Test removal of non-ASCII characters
+    assert normalize_config_name("Héllo Wörld") == "hllo-wrld"
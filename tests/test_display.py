@@ -1,16 +1,27 @@
 """Tests for display utilities."""
 
+import threading
 import unittest
 from unittest.mock import Mock, patch
 
-from cci.utils.display import display_configs_table, display_env_vars_and_command
+from cci.utils.display import _get_console, _prefetch_live_models, display_configs_table, display_env_vars_and_command
 
 
 class TestDisplayUtils(unittest.TestCase):
     """Test cases for display utilities."""
 
-    @patch('cci.utils.display.Console')
-    def test_display_env_vars_and_command_with_vars_and_args(self, mock_console):
+    def setUp(self):
+        """Patch Console once per test and drop the shared console so the mock is picked up."""
+        _get_console.cache_clear()
+        console_patcher = patch('rich.console.Console')
+        self.mock_console = console_patcher.start()
+        self.addCleanup(console_patcher.stop)
+
+    def tearDown(self):
+        """Drop any mocked console cached during the test."""
+        _get_console.cache_clear()
+
+    def test_display_env_vars_and_command_with_vars_and_args(self):
         """Test display_env_vars_and_command with environment variables and command args."""
         env_vars = {'TEST_VAR': 'test_value', 'ANOTHER_VAR': 'another_value'}
         command_args = ['--help']
@@ -18,10 +29,9 @@ class TestDisplayUtils(unittest.TestCase):
         display_env_vars_and_command(env_vars, command_args)
 
         # Check that console print was called
-        self.assertTrue(mock_console.return_value.print.called)
+        self.assertTrue(self.mock_console.return_value.print.called)
 
-    @patch('cci.utils.display.Console')
-    def test_display_env_vars_and_command_without_vars(self, mock_console):
+    def test_display_env_vars_and_command_without_vars(self):
         """Test display_env_vars_and_command without environment variables."""
         env_vars = {}
         command_args = ['--version']
@@ -29,10 +39,9 @@ class TestDisplayUtils(unittest.TestCase):
         display_env_vars_and_command(env_vars, command_args)
 
         # Check that console print was called
-        self.assertTrue(mock_console.return_value.print.called)
+        self.assertTrue(self.mock_console.return_value.print.called)
 
-    @patch('cci.utils.display.Console')
-    def test_display_env_vars_and_command_without_args(self, mock_console):
+    def test_display_env_vars_and_command_without_args(self):
         """Test display_env_vars_and_command without command args."""
         env_vars = {'TEST_VAR': 'test_value'}
         command_args = []
@@ -40,10 +49,9 @@ class TestDisplayUtils(unittest.TestCase):
         display_env_vars_and_command(env_vars, command_args)
 
         # Check that console print was called
-        self.assertTrue(mock_console.return_value.print.called)
+        self.assertTrue(self.mock_console.return_value.print.called)
 
-    @patch('cci.utils.display.Console')
-    def test_display_configs_table_empty(self, mock_console):
+    def test_display_configs_table_empty(self):
         """Test display_configs_table with no saved configurations."""
         mock_config_manager = Mock()
         mock_config_manager.config = {'configs': {}}
@@ -51,11 +59,10 @@ class TestDisplayUtils(unittest.TestCase):
         display_configs_table(mock_config_manager)
 
         # Check that yellow message was printed for no configs
-        mock_console.return_value.print.assert_called_with("[yellow]No saved configurations found.[/yellow]")
+        self.mock_console.return_value.print.assert_called_with("[yellow]No saved configurations found.[/yellow]")
 
-    @patch('cci.utils.display.Console')
-    @patch('cci.utils.display.Table')
-    def test_display_configs_table_with_configs(self, mock_table, mock_console):
+    @patch('rich.table.Table')
+    def test_display_configs_table_with_configs(self, mock_table):
         """Test display_configs_table with saved configurations."""
         mock_config_manager = Mock()
         mock_config_manager.config = {
@@ -80,8 +87,63 @@ class TestDisplayUtils(unittest.TestCase):
 
         # Check that table was created and printed
         self.assertTrue(mock_table.return_value.add_column.called)
-        self.assertTrue(mock_table.return_value.add_row.called)
-        self.assertTrue(mock_console.return_value.print.called)
+        mock_table.return_value.add_row.assert_called_once_with(
+            'test-config', 'test-provider', 'test-haiku', 'test-sonnet', 'test-opus', '[bold green]✓[/bold green]'
+        )
+        self.assertTrue(self.mock_console.return_value.print.called)
+
+    @patch('rich.table.Table')
+    def test_display_configs_table_fetches_each_provider_once(self, mock_table):
+        """Test that live models are fetched once per distinct provider."""
+        mock_config_manager = Mock()
+        mock_config_manager.config = {
+            'configs': {
+                'config-a': {'provider': 'provider-1', 'models': {'haiku': 'm1'}},
+                'config-b': {'provider': 'provider-1', 'models': {'haiku': 'm1'}},
+                'config-c': {'provider': 'provider-2', 'models': {'haiku': 'm2'}},
+            },
+            'default_config': None
+        }
+        mock_config_manager.get_live_models_for_provider.return_value = ['m1', 'm2']
+
+        display_configs_table(mock_config_manager)
+
+        fetched = sorted(c.args[0] for c in mock_config_manager.get_live_models_for_provider.call_args_list)
+        self.assertEqual(fetched, ['provider-1', 'provider-2'])
+        self.assertEqual(mock_table.return_value.add_row.call_count, 3)
+
+    def test_prefetch_live_models(self):
+        """Test that prefetched models are returned as sets, keeping None for failed providers."""
+        mock_config_manager = Mock()
+        mock_config_manager.get_live_models_for_provider.side_effect = (
+            lambda name: ['m1', 'm2'] if name == 'provider-1' else None)
+
+        result = _prefetch_live_models(mock_config_manager, {'provider-1', 'provider-2'})
+
+        self.assertEqual(result, {'provider-1': {'m1', 'm2'}, 'provider-2': None})
+        self.assertEqual(_prefetch_live_models(mock_config_manager, set()), {})
+
+    def test_prefetch_reuses_worker_threads(self):
+        """Test that lookups run on pool threads that survive between calls, keeping their sessions."""
+        threads = []
+        mock_config_manager = Mock()
+        mock_config_manager.get_live_models_for_provider.side_effect = (
+            lambda name: threads.append(threading.current_thread()) or ['m1'])
+
+        _prefetch_live_models(mock_config_manager, {'provider-1'})
+        _prefetch_live_models(mock_config_manager, {'provider-1'})
+
+        # Either idle worker may take the second lookup, but both outlive the calls
+        for thread in threads:
+            self.assertTrue(thread.name.startswith('cci-models'))
+            self.assertTrue(thread.is_alive())
+
+    def test_console_reused_across_calls(self):
+        """Test that the console is created once and reused."""
+        display_env_vars_and_command({}, [])
+        display_env_vars_and_command({}, [])
+
+        self.mock_console.assert_called_once()
 
 
 if __name__ == '__main__':
@@ -1,6 +1,7 @@
 """Tests for the main module."""
 
 import sys
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -9,40 +10,55 @@ from cci.__main__ import (handle_config_command, handle_help_command, handle_hel
                           handle_list_configs_command, handle_version_command, launch_claude_cli, load_configuration,
                           main)
 
+# Printed by both launch paths when the claude executable is missing
+CLAUDE_NOT_FOUND_MSG = "Error: Claude Code CLI ('claude') not found. Please ensure it's installed and in your PATH.\n"
 
-def test_handle_version_command():
-    """Test the handle_version_command function."""
-    with patch('cci.__main__.get_project_version') as mock_get_version, \
-            patch('builtins.print') as mock_print:
 
-        # Test with version
-        mock_get_version.return_value = '1.2.3'
-        handle_version_command()
-        mock_print.assert_called_once_with('Claude Code Interceptor v1.2.3')
+@pytest.fixture
+def mock_config_manager(mocker):
+    """Patch get_config_manager to return a MagicMock config manager."""
+    config_manager = MagicMock()
+    mocker.patch('cci.config.get_config_manager', return_value=config_manager)
+    return config_manager
+
+
+@pytest.fixture
+def loaded_env(mocker):
+    """Patch load_configuration to return a fixed environment and return that environment."""
+    env = {'TEST_VAR': 'test_value'}
+    mocker.patch('cci.__main__.load_configuration', return_value=env)
+    return env
+
 
-        # Reset mocks
-        mock_print.reset_mock()
+@pytest.fixture
+def mock_exit(mocker, loaded_env):
+    """Patch configuration loading and display for the launch tests, returning the sys.exit mock."""
+    mocker.patch('cci.__main__.display_env_vars_and_command')
+    return mocker.patch('sys.exit')
 
-        # Test without version
-        mock_get_version.return_value = None
+
+@pytest.mark.parametrize("version, expected", [
+    pytest.param('1.2.3', 'Claude Code Interceptor v1.2.3', id="known"),
+    pytest.param(None, 'Claude Code Interceptor vUnknown', id="unknown"),
+])
+def test_handle_version_command(version, expected, capsys):
+    """Test the handle_version_command function."""
+    with patch('cci.__main__.get_project_version', return_value=version):
         handle_version_command()
-        mock_print.assert_called_once_with('Claude Code Interceptor vUnknown')
 
+    assert capsys.readouterr().out == f"{expected}\n"
 
-def test_handle_help_command():
-    """Test the handle_help_command function."""
-    with patch('cci.__main__.get_project_version') as mock_get_version, \
-            patch('builtins.print') as mock_print:
 
-        # Test with version
-        mock_get_version.return_value = '1.2.3'
+def test_handle_help_command(capsys):
+    """Test the handle_help_command function."""
+    with patch('cci.__main__.get_project_version', return_value='1.2.3'):
         handle_help_command()
 
-        # Check that print was called with expected messages
-        calls = mock_print.call_args_list
-        assert any('Claude Code Interceptor v1.2.3' in str(call) for call in calls)
-        assert any('A wrapper for Claude Code CLI' in str(call) for call in calls)
-        assert any('Usage: cci [OPTIONS] [CLAUD_ARGS]...' in str(call) for call in calls)
+    # Check that the expected messages were printed
+    out = capsys.readouterr().out
+    assert 'Claude Code Interceptor v1.2.3' in out
+    assert 'A wrapper for Claude Code CLI' in out
+    assert 'Usage: cci [OPTIONS] [CLAUD_ARGS]...' in out
 
 
 @patch('cci.tui.ConfigTUI')
@@ -57,75 +73,46 @@ def test_handle_config_command(mock_config_tui):
     mock_tui_instance.run.assert_called_once()
 
 
-@patch('cci.config.get_config_manager')
 @patch('cci.utils.display.display_configs_table')
-def test_handle_list_configs_command(mock_display_table, mock_get_config_manager):
+def test_handle_list_configs_command(mock_display_table, mock_config_manager):
     """Test the handle_list_configs_command function."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
-
     handle_list_configs_command()
 
-    mock_get_config_manager.assert_called_once()
     mock_display_table.assert_called_once_with(mock_config_manager)
 
 
-@patch('cci.__main__.load_configuration')
-def test_launch_claude_cli_success(mock_load_config):
+def test_launch_claude_cli_success(mocker, mock_exit):
     """Test launch_claude_cli function with successful execution."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
-
-    with patch('subprocess.run') as mock_run, \
-            patch('sys.exit') as mock_exit:
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_run.return_value = mock_result
+    mock_run = mocker.patch('subprocess.run', return_value=SimpleNamespace(returncode=0))
 
-        # This should not raise an exception
-        launch_claude_cli([], [])
+    # This should not raise an exception
+    launch_claude_cli([], [])
 
-        mock_run.assert_called_once()
-        mock_exit.assert_called_once_with(0)
+    mock_run.assert_called_once()
+    mock_exit.assert_called_once_with(0)
 
 
-@patch('cci.__main__.load_configuration')
-def test_launch_claude_cli_file_not_found(mock_load_config):
+def test_launch_claude_cli_file_not_found(mocker, mock_exit, capsys):
     """Test launch_claude_cli function when claude CLI is not found."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
-
-    with patch('subprocess.run') as mock_run, \
-            patch('builtins.print') as mock_print, \
-            patch('sys.exit') as mock_exit:
-        mock_run.side_effect = FileNotFoundError()
+    mocker.patch('subprocess.run', side_effect=FileNotFoundError())
 
-        launch_claude_cli([], [])
+    launch_claude_cli([], [])
 
-        mock_exit.assert_called_once_with(1)
-        mock_print.assert_called_with(
-            "Error: Claude Code CLI ('claude') not found. Please ensure it's installed and in your PATH."
-        )
+    mock_exit.assert_called_once_with(1)
+    assert capsys.readouterr().out.endswith(CLAUDE_NOT_FOUND_MSG)
 
 
-@patch('cci.__main__.load_configuration')
-@patch('cci.utils.display.display_env_vars_and_command')
-def test_launch_claude_cli_keyboard_interrupt(mock_display, mock_load_config):
+def test_launch_claude_cli_keyboard_interrupt(mocker, mock_exit):
     """Test launch_claude_cli function when KeyboardInterrupt is raised."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
+    mocker.patch('subprocess.run', side_effect=KeyboardInterrupt())
 
-    with patch('subprocess.run') as mock_run, \
-            patch('sys.exit') as mock_exit:
-        mock_run.side_effect = KeyboardInterrupt()
+    launch_claude_cli([], [])
 
-        launch_claude_cli([], [])
+    mock_exit.assert_called_once_with(0)
 
-        mock_exit.assert_called_once_with(0)
 
-
-@patch('cci.config.get_config_manager')
-def test_load_configuration_success(mock_get_config_manager):
+def test_load_configuration_success(mock_config_manager):
     """Test load_configuration function with successful config loading."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
 
     mock_config = MagicMock()
     mock_config_manager.load_config_by_name.return_value = mock_config
@@ -138,11 +125,8 @@ def test_load_configuration_success(mock_get_config_manager):
     mock_config_manager.set_default_if_just_one_config.assert_called_once()
 
 
-@patch('cci.config.get_config_manager')
-def test_load_configuration_with_specific_config(mock_get_config_manager):
+def test_load_configuration_with_specific_config(mock_config_manager):
     """Test load_configuration function with --cci-use-config argument."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
 
     mock_config = MagicMock()
     mock_config_manager.load_config_by_name.return_value = mock_config
@@ -155,89 +139,61 @@ def test_load_configuration_with_specific_config(mock_get_config_manager):
 
 
 @patch('cci.__main__.handle_list_configs_command')
-@patch('cci.config.get_config_manager')
-def test_load_configuration_config_not_found(mock_get_config_manager, mock_handle_list):
+def test_load_configuration_config_not_found(mock_handle_list, mock_config_manager, capsys):
     """Test load_configuration function when config is not found."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
 
     mock_config_manager.load_config_by_name.return_value = None
     mock_config_manager.get_default_config_name.return_value = 'nonexistent_config'
 
-    with patch('builtins.print') as mock_print, \
-            pytest.raises(SystemExit) as exc_info:
+    with pytest.raises(SystemExit) as exc_info:
         load_configuration([])
 
     assert exc_info.value.code == 1
+    out = capsys.readouterr().out
     # Verify error message is printed
-    assert any("Error: Configuration 'nonexistent_config' not found." in str(call)
-               for call in mock_print.call_args_list)
+    assert "Error: Configuration 'nonexistent_config' not found." in out
     # Verify available configs header is printed
-    assert any("Available configurations:" in str(call)
-               for call in mock_print.call_args_list)
+    assert "Available configurations:" in out
     # Verify handle_list_configs_command was called
     mock_handle_list.assert_called_once()
 
 
-@patch('cci.config.get_config_manager')
-def test_load_configuration_no_default_or_specified(mock_get_config_manager):
+def test_load_configuration_no_default_or_specified(mock_config_manager, capsys):
     """Test load_configuration function when no config is available."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
 
     mock_config_manager.get_default_config_name.return_value = None
     mock_config_manager.load_config_by_name.return_value = None
 
-    with patch('builtins.print') as mock_print, \
-            pytest.raises(SystemExit) as exc_info:
+    with pytest.raises(SystemExit) as exc_info:
         load_configuration([])
 
     assert exc_info.value.code == 1
-    mock_print.assert_called_with(
-        "Error: Set a default model (--cci-config) or use --cci-use-config with a valid configuration name."
+    assert capsys.readouterr().out.endswith(
+        "Error: Set a default model (--cci-config) or use --cci-use-config with a valid configuration name.\n"
     )
 
 
-@patch('sys.argv', ['cci', '--cci-version'])
-@patch('cci.__main__.handle_version_command')
-def test_main_version_command(mock_handle_version):
-    """Test main function with --cci-version argument."""
-    main()
-
-    mock_handle_version.assert_called_once()
-
-
-@patch('sys.argv', ['cci', '--cci-help'])
-@patch('cci.__main__.handle_help_command')
-def test_main_help_command(mock_handle_help):
-    """Test main function with --cci-help argument."""
-    main()
-
-    mock_handle_help.assert_called_once()
-
-
-@patch('sys.argv', ['cci', '--cci-config'])
-@patch('cci.__main__.handle_config_command')
-def test_main_config_command(mock_handle_config):
-    """Test main function with --cci-config argument."""
-    main()
-
-    mock_handle_config.assert_called_once()
+@pytest.mark.parametrize("flag, handler", [
+    pytest.param('--cci-version', 'handle_version_command', id="version"),
+    pytest.param('--cci-help', 'handle_help_command', id="help"),
+    pytest.param('--cci-config', 'handle_config_command', id="config"),
+    pytest.param('--cci-list-configs', 'handle_list_configs_command', id="list-configs"),
+])
+def test_main_cci_command(monkeypatch, flag, handler):
+    """Test that main dispatches each --cci-* command to its handler."""
+    monkeypatch.setattr(sys, 'argv', ['cci', flag])
 
+    with patch(f'cci.__main__.{handler}') as mock_handler:
+        main()
 
-@patch('sys.argv', ['cci', '--cci-list-configs'])
-@patch('cci.__main__.handle_list_configs_command')
-def test_main_list_configs_command(mock_handle_list_configs):
-    """Test main function with --cci-list-configs argument."""
-    main()
-
-    mock_handle_list_configs.assert_called_once()
+    mock_handler.assert_called_once()
 
 
-@patch('sys.argv', ['cci', '--help'])
 @patch('cci.__main__.handle_help_passthrough')
-def test_main_help_passthrough(mock_handle_help_passthrough):
+def test_main_help_passthrough(mock_handle_help_passthrough, mock_config_manager, monkeypatch):
     """Test main function with --help argument."""
+    monkeypatch.setattr(sys, 'argv', ['cci', '--help'])
+    mock_config_manager.config = {'configs': {'default': {}}}
     mock_handle_help_passthrough.side_effect = SystemExit(0)
 
     with pytest.raises(SystemExit):
@@ -246,119 +202,77 @@ def test_main_help_passthrough(mock_handle_help_passthrough):
     mock_handle_help_passthrough.assert_called_once()
 
 
-@patch('sys.argv', ['cci'])
-@patch('cci.config.get_config_manager')
+@pytest.mark.parametrize("argv, claude_args, cci_args", [
+    pytest.param(['cci'], [], [], id="default"),
+    pytest.param(['cci', '--model', 'opus'], ['--model', 'opus'], [], id="passthrough-args"),
+    pytest.param(['cci', '--cci-use-config', 'test-config'], [], ['--cci-use-config', 'test-config'], id="use-config"),
+])
 @patch('cci.__main__.launch_claude_cli')
-def test_main_launch_claude_cli(mock_launch_claude_cli, mock_get_config_manager):
-    """Test main function launching Claude CLI."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
-    mock_config_manager.config = {'configs': {'default': {}}}
+def test_main_launch_claude_cli(mock_launch_claude_cli, mock_config_manager, monkeypatch, argv, claude_args, cci_args):
+    """Test main function launching Claude CLI with the split arguments."""
+    monkeypatch.setattr(sys, 'argv', argv)
+    mock_config_manager.config = {'configs': {'default': {}, 'test-config': {}}}
 
     main()
 
-    mock_launch_claude_cli.assert_called_once()
+    mock_launch_claude_cli.assert_called_once_with(claude_args, cci_args)
 
 
-@patch('sys.argv', ['cci'])
-@patch('cci.config.get_config_manager')
-def test_main_no_configs_exit(mock_get_config_manager):
+def test_main_no_configs_exit(mock_config_manager, monkeypatch, capsys):
     """Test main function exiting when no configurations exist."""
-    mock_config_manager = MagicMock()
-    mock_get_config_manager.return_value = mock_config_manager
+    monkeypatch.setattr(sys, 'argv', ['cci'])
     mock_config_manager.config = {'configs': {}}
 
-    with patch('builtins.print') as mock_print, \
-            pytest.raises(SystemExit) as exc_info:
+    with pytest.raises(SystemExit) as exc_info:
         main()
 
     assert exc_info.value.code == 1
-    mock_print.assert_called_with(
-        "No configuration found. Please run 'cci --cci-config' to set up your configuration."
+    assert capsys.readouterr().out.endswith(
+        "No configuration found. Please run 'cci --cci-config' to set up your configuration.\n"
     )
 
 
-@patch('cci.__main__.load_configuration')
-@patch('cci.utils.display.display_env_vars_and_command')
-@patch('subprocess.run')
-def test_handle_help_passthrough_success(mock_subprocess, mock_display, mock_load_config):
+def test_handle_help_passthrough_success(mocker, mock_exit, loaded_env):
     """Test handle_help_passthrough function with successful execution."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
-    mock_result = MagicMock()
-    mock_result.stdout = "Claude help output"
-    mock_result.stderr = ""
-    mock_result.returncode = 0
-    mock_subprocess.return_value = mock_result
-
-    with patch('sys.exit') as mock_exit:
-        handle_help_passthrough(['--help'], [])
-
-        # Check that subprocess.run was called with the right arguments
-        mock_subprocess.assert_called_once()
-        call_args = mock_subprocess.call_args
-        assert call_args[0][0] == ['claude', '--help']
-        assert call_args[1]['capture_output'] is True
-        assert call_args[1]['text'] is True
-        # Check that our TEST_VAR is in the env
-        assert call_args[1]['env']['TEST_VAR'] == 'test_value'
-        mock_exit.assert_called_once_with(0)
-
-
-@patch('cci.__main__.load_configuration')
-@patch('cci.utils.display.display_env_vars_and_command')
-@patch('subprocess.run')
-def test_handle_help_passthrough_file_not_found(mock_subprocess, mock_display, mock_load_config):
-    """Test handle_help_passthrough function when claude CLI is not found."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
-    mock_subprocess.side_effect = FileNotFoundError()
+    mock_subprocess = mocker.patch(
+        'subprocess.run', return_value=SimpleNamespace(stdout="Claude help output", stderr="", returncode=0))
 
-    with patch('builtins.print') as mock_print, \
-            patch('sys.exit') as mock_exit:
-        handle_help_passthrough(['--help'], [])
+    handle_help_passthrough(['--help'], [])
 
-        mock_print.assert_called_with(
-            "Error: Claude Code CLI ('claude') not found. Please ensure it's installed and in your PATH."
-        )
-        mock_exit.assert_called_once_with(1)
+    # Check that subprocess.run was called with the right arguments
+    mock_subprocess.assert_called_once()
+    call_args = mock_subprocess.call_args
+    assert call_args[0][0] == ['claude', '--help']
+    assert call_args[1]['capture_output'] is True
+    assert call_args[1]['text'] is True
+    # Check that the loaded configuration is in the env
+    assert loaded_env.items() <= call_args[1]['env'].items()
+    mock_exit.assert_called_once_with(0)
 
 
-@patch('cci.__main__.load_configuration')
-@patch('cci.utils.display.display_env_vars_and_command')
-@patch('subprocess.run')
-def test_handle_help_passthrough_with_stderr(mock_subprocess, mock_display, mock_load_config):
-    """Test handle_help_passthrough function when there's stderr output."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
-    mock_result = MagicMock()
-    mock_result.stdout = "Claude help output"
-    mock_result.stderr = "Some error message"
-    mock_result.returncode = 0
-    mock_subprocess.return_value = mock_result
+def test_handle_help_passthrough_file_not_found(mocker, mock_exit, capsys):
+    """Test handle_help_passthrough function when claude CLI is not found."""
+    mocker.patch('subprocess.run', side_effect=FileNotFoundError())
 
-    with patch('builtins.print') as mock_print, \
-            patch('sys.exit') as mock_exit:
-        handle_help_passthrough(['--help'], [])
+    handle_help_passthrough(['--help'], [])
 
-        # Check that both stdout and stderr were printed
-        mock_print.assert_any_call("Claude help output")
-        mock_print.assert_any_call("Some error message", file=sys.stderr)
-        mock_exit.assert_called_once_with(0)
+    assert capsys.readouterr().out.endswith(CLAUDE_NOT_FOUND_MSG)
+    mock_exit.assert_called_once_with(1)
 
 
-@patch('sys.argv', ['cci', '--cci-use-config', 'test-config'])
-@patch('cci.__main__.load_configuration')
-@patch('cci.__main__.launch_claude_cli')
-def test_main_with_cci_use_config_argument(mock_launch_claude_cli, mock_load_config):
-    """Test main function with --cci-use-config argument."""
-    mock_load_config.return_value = {'TEST_VAR': 'test_value'}
-
-    with patch('cci.config.get_config_manager') as mock_get_config_manager:
-        mock_config_manager = MagicMock()
-        mock_get_config_manager.return_value = mock_config_manager
-        mock_config_manager.config = {'configs': {'default': {}}}
-
-        # We can't easily test the full main function, but we can test that
-        # our tests have improved coverage by running all tests and checking coverage
-        pass
+def test_handle_help_passthrough_with_stderr(mocker, mock_exit, capsys):
+    """Test handle_help_passthrough function when there's stderr output."""
+    mocker.patch(
+        'subprocess.run',
+        return_value=SimpleNamespace(stdout="Claude help output", stderr="Some error message", returncode=0))
+
+    handle_help_passthrough(['--help'], [])
+
+    # Check that both stdout and stderr were printed
+    captured = capsys.readouterr()
+    assert captured.out.startswith("Claude help output\n")
+    assert captured.err == "Some error message\n"
+    mock_exit.assert_called_once_with(0)
 
 
 if __name__ == '__main__':
@@ -2,11 +2,32 @@
 
 import json
 import os
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
+import pytest
 import requests
 
-from cci.utils.models_fetch import discover_models_endpoint, fetch_models, list_models, normalize_base_url
+from cci.utils import models_fetch
+from cci.utils.models_fetch import (clear_models_cache, discover_models_endpoint, fetch_models, list_models,
+                                    normalize_base_url, parse_model_names)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty model list cache."""
+    clear_models_cache()
+    yield
+    clear_models_cache()
+
+
+@contextmanager
+def _patch_session():
+    """Patch the per-thread session, yielding the mock that requests go through."""
+    with patch('cci.utils.models_fetch._get_session') as mock_get_session:
+        yield mock_get_session.return_value
 
 
 def load_fixture(filename):
@@ -16,81 +37,184 @@ def load_fixture(filename):
         return json.load(f)
 
 
-def test_normalize_base_url():
+# Loaded once for the module; tests only read it
+MODELS_DATA = load_fixture('models_response.json')
+
+MODELS_DATA_NAMES = [
+    "gpt-5.1", "gpt-5.1-codex", "gpt-5-mini", "gpt-5-pro", "gpt-5-nano",
+    "claude-sonnet", "claude-haiku", "claude-opus", "qwen3-coder-480b",
+    "GLM-4.5-Air", "Intellect3", "Minimax-M2", "Qwen3-30B-A3B-Thinking-2507",
+    "Qwen3-Next-80B-A3B", "Qwen3-VL-8B", "gpt-oss-120b", "gpt-oss-20b",
+    "nomic-embed-text-v2-moe"
+]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    pytest.param("http://example.com/", "http://example.com", id="trailing-slash"),
+    pytest.param("http://example.com/v1", "http://example.com", id="v1"),
+    pytest.param("http://example.com/v1/", "http://example.com", id="v1-trailing-slash"),
+    pytest.param("http://example.com", "http://example.com", id="base"),
+    pytest.param("http://example.com/api/v1", "http://example.com/api", id="v1-under-sub-path"),
+    pytest.param("http://v1", "http://v1", id="host-named-v1"),
+    pytest.param("https://api.example.com/v1/", "https://api.example.com", id="https"),
+    pytest.param("http://example.com//", "http://example.com", id="repeated-trailing-slashes"),
+    pytest.param("http://example.com/v1/v1/", "http://example.com/v1", id="only-last-v1-removed"),
+    pytest.param("http://example.com/v10", "http://example.com/v10", id="v10-kept"),
+])
+def test_normalize_base_url(raw, expected):
     """Test the normalize_base_url function."""
-    # Test with trailing slash
-    assert normalize_base_url("http://example.com/") == "http://example.com"
-
-    # Test with /v1 path
-    assert normalize_base_url("http://example.com/v1") == "http://example.com"
-
-    # Test with /v1/ path
-    assert normalize_base_url("http://example.com/v1/") == "http://example.com"
-
-    # Test with base URL
-    assert normalize_base_url("http://example.com") == "http://example.com"
+    assert normalize_base_url(raw) == expected
 
 
 def test_discover_models_endpoint_success():
     """Test discover_models_endpoint when it finds a working endpoint."""
-    with patch('requests.get') as mock_get:
+    with _patch_session() as mock_session:
         # Mock successful response for /v1/models
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_session.head.return_value = SimpleNamespace(status_code=200)
+
+        result = discover_models_endpoint("http://example.com")
+        assert result == "http://example.com/v1/models"
+        mock_session.get.assert_not_called()
+
+
+def test_discover_models_endpoint_head_not_allowed():
+    """Test discover_models_endpoint retrying with GET when HEAD is not supported."""
+    with _patch_session() as mock_session:
+        mock_session.head.return_value = SimpleNamespace(status_code=405)
+        mock_session.get.return_value = SimpleNamespace(status_code=200)
 
         result = discover_models_endpoint("http://example.com")
         assert result == "http://example.com/v1/models"
+        mock_session.head.assert_called_once()
+        mock_session.get.assert_called_once()
 
 
-def test_discover_models_endpoint_fallback():
-    """Test discover_models_endpoint falling back to /models."""
-    with patch('requests.get') as mock_get:
-        # Mock failure for /v1/models and success for /models
-        def side_effect(url, **kwargs):
-            mock_response = Mock()
-            if url == "http://example.com/v1/models":
-                raise requests.RequestException("Connection failed")
-            elif url == "http://example.com/models":
-                mock_response.status_code = 200
-                return mock_response
-            return mock_response
+def test_discover_models_endpoint_get_after_head_timeout():
+    """Test discover_models_endpoint retrying the same path with GET when HEAD is too slow to answer."""
+    with _patch_session() as mock_session:
+        mock_session.head.side_effect = requests.ReadTimeout("Probe timed out")
+        mock_session.get.return_value = SimpleNamespace(status_code=200)
 
-        mock_get.side_effect = side_effect
+        result = discover_models_endpoint("http://example.com")
+        assert result == "http://example.com/v1/models"
+        mock_session.get.assert_called_once_with(
+            "http://example.com/v1/models", headers={}, timeout=models_fetch._FETCH_TIMEOUT)
+
+
+@pytest.mark.parametrize("first_head", [
+    requests.ConnectionError("Connection failed"),
+    SimpleNamespace(status_code=404),
+], ids=["connection-error", "not-found"])
+def test_discover_models_endpoint_fallback(first_head):
+    """Test discover_models_endpoint falling back to /models without retrying /v1/models with GET."""
+    with _patch_session() as mock_session:
+        # Paths are probed in order: /v1/models fails, /models succeeds
+        mock_session.head.side_effect = [first_head, SimpleNamespace(status_code=200)]
 
         result = discover_models_endpoint("http://example.com")
         assert result == "http://example.com/models"
+        assert [call.args[0] for call in mock_session.head.call_args_list] == [
+            "http://example.com/v1/models", "http://example.com/models"]
+        mock_session.get.assert_not_called()
 
 
 def test_discover_models_endpoint_none():
     """Test discover_models_endpoint when no endpoints work."""
-    with patch('requests.get') as mock_get:
+    with _patch_session() as mock_session:
         # Mock failures for all endpoints
-        mock_get.side_effect = requests.RequestException("Connection failed")
+        mock_session.head.side_effect = requests.ConnectTimeout("Connection timed out")
 
         result = discover_models_endpoint("http://example.com")
         assert result is None
+        assert mock_session.head.call_count == 2
+        mock_session.get.assert_not_called()
+
+
+def test_discover_models_endpoint_cached():
+    """Test that a discovered endpoint is reused without probing again."""
+    with _patch_session() as mock_session:
+        mock_session.head.return_value = SimpleNamespace(status_code=200)
+
+        assert discover_models_endpoint("http://example.com") == "http://example.com/v1/models"
+        assert discover_models_endpoint("http://example.com") == "http://example.com/v1/models"
+        mock_session.head.assert_called_once()
+
+
+def test_discover_models_endpoint_failure_expires():
+    """Test that a failed discovery is re-probed once its TTL has passed."""
+    with _patch_session() as mock_session, \
+            patch('cci.utils.models_fetch.time.monotonic') as mock_monotonic:
+        mock_session.head.side_effect = requests.RequestException("Connection failed")
+        mock_monotonic.return_value = 100.0
+
+        assert discover_models_endpoint("http://example.com") is None
+        assert discover_models_endpoint("http://example.com") is None
+        assert mock_session.head.call_count == 2  # one probe per path
+
+        mock_monotonic.return_value = 200.0
+        assert discover_models_endpoint("http://example.com") is None
+        assert mock_session.head.call_count == 4
+
+
+def test_get_session_per_thread():
+    """Test that each thread reuses its own session rather than sharing one."""
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(models_fetch._get_session()))
+    thread.start()
+    thread.join()
+
+    assert models_fetch._get_session() is models_fetch._get_session()
+    assert sessions[0] is not models_fetch._get_session()
 
 
 def test_fetch_models_success():
     """Test fetch_models with successful response."""
     with patch('cci.utils.models_fetch.discover_models_endpoint') as mock_discover, \
-            patch('requests.get') as mock_get:
+            _patch_session() as mock_session:
 
         # Mock discovery to return a URL
         mock_discover.return_value = "http://example.com/v1/models"
 
-        # Load real models data
-        models_data = load_fixture('models_response.json')
+        # Use real models data
+        models_data = MODELS_DATA
 
         # Mock successful response
         mock_response = Mock()
-        mock_response.json.return_value = models_data
+        mock_response.iter_content.return_value = [json.dumps(models_data).encode()]
         mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_session.get.return_value = mock_response
 
         result = fetch_models("http://example.com")
         assert result == models_data
+        mock_response.close.assert_called_once()
+
+
+def test_fetch_models_oversized_response():
+    """Test fetch_models gives up on responses over the size cap."""
+    with patch('cci.utils.models_fetch.discover_models_endpoint') as mock_discover, \
+            _patch_session() as mock_session, \
+            patch('cci.utils.models_fetch._MAX_RESPONSE_BYTES', 10):
+        mock_discover.return_value = "http://example.com/v1/models"
+
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [b'{"data": [', b'{"id": "model-1"}', b']}']
+        mock_session.get.return_value = mock_response
+
+        assert fetch_models("http://example.com") is None
+        mock_response.close.assert_called_once()
+
+
+def test_fetch_models_invalid_json():
+    """Test fetch_models when the response body is not JSON."""
+    with patch('cci.utils.models_fetch.discover_models_endpoint') as mock_discover, \
+            _patch_session() as mock_session:
+        mock_discover.return_value = "http://example.com/v1/models"
+
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [b'<html>not json</html>']
+        mock_session.get.return_value = mock_response
+
+        assert fetch_models("http://example.com") is None
 
 
 def test_fetch_models_discovery_failed():
@@ -106,76 +230,67 @@ def test_fetch_models_discovery_failed():
 def test_fetch_models_request_failed():
     """Test fetch_models when the request fails."""
     with patch('cci.utils.models_fetch.discover_models_endpoint') as mock_discover, \
-            patch('requests.get') as mock_get:
+            _patch_session() as mock_session:
 
         # Mock discovery to return a URL
         mock_discover.return_value = "http://example.com/v1/models"
 
         # Mock request exception
-        mock_get.side_effect = requests.RequestException("Request failed")
+        mock_session.get.side_effect = requests.RequestException("Request failed")
 
         result = fetch_models("http://example.com")
         assert result is None
 
 
-def test_list_models_openai_format():
-    """Test list_models with OpenAI-like response format."""
-    # Load real models data
-    models_data = load_fixture('models_response.json')
-
-    with patch('cci.utils.models_fetch.fetch_models') as mock_fetch:
-        mock_fetch.return_value = models_data
-
-        result = list_models("http://example.com")
-
-        # Check that we get the expected model names
-        expected_models = [
-            "gpt-5.1", "gpt-5.1-codex", "gpt-5-mini", "gpt-5-pro", "gpt-5-nano",
-            "claude-sonnet", "claude-haiku", "claude-opus", "qwen3-coder-480b",
-            "GLM-4.5-Air", "Intellect3", "Minimax-M2", "Qwen3-30B-A3B-Thinking-2507",
-            "Qwen3-Next-80B-A3B", "Qwen3-VL-8B", "gpt-oss-120b", "gpt-oss-20b",
-            "nomic-embed-text-v2-moe"
-        ]
-        assert result == expected_models
+@pytest.mark.parametrize("models_data, expected", [
+    pytest.param(MODELS_DATA, MODELS_DATA_NAMES, id="openai"),
+    pytest.param([{"id": "model1"}, {"id": "model2"}], ["model1", "model2"], id="simple-list"),
+    pytest.param(["model1", "model2"], ["model1", "model2"], id="string-list"),
+    pytest.param(None, [], id="empty"),
+    pytest.param({"unknown_key": "unknown_value"}, [], id="invalid"),
+])
+def test_list_models_formats(models_data, expected):
+    """Test list_models with the supported and unsupported response formats."""
+    with patch('cci.utils.models_fetch.fetch_models', return_value=models_data):
+        assert list_models("http://example.com") == expected
 
 
-def test_list_models_simple_list_format():
-    """Test list_models with simple list format."""
-    models_data = [{"id": "model1"}, {"id": "model2"}]
-
+def test_list_models_cached():
+    """Test that list_models only fetches once per base URL and API key."""
     with patch('cci.utils.models_fetch.fetch_models') as mock_fetch:
-        mock_fetch.return_value = models_data
+        mock_fetch.return_value = ["model1"]
 
-        result = list_models("http://example.com")
-        assert result == ["model1", "model2"]
+        assert list_models("http://example.com") == ["model1"]
+        assert list_models("http://example.com") == ["model1"]
+        mock_fetch.assert_called_once()
 
+        clear_models_cache()
+        list_models("http://example.com")
+        assert mock_fetch.call_count == 2
 
-def test_list_models_string_list_format():
-    """Test list_models with string list format."""
-    models_data = ["model1", "model2"]
 
+def test_list_models_failure_not_cached():
+    """Test that an empty result is retried on the next call."""
     with patch('cci.utils.models_fetch.fetch_models') as mock_fetch:
-        mock_fetch.return_value = models_data
-
-        result = list_models("http://example.com")
-        assert result == ["model1", "model2"]
+        mock_fetch.return_value = None
+        assert list_models("http://example.com") == []
 
+        mock_fetch.return_value = ["model1"]
+        assert list_models("http://example.com") == ["model1"]
 
-def test_list_models_empty_response():
-    """Test list_models with empty response."""
-    with patch('cci.utils.models_fetch.fetch_models') as mock_fetch:
-        mock_fetch.return_value = None
 
-        result = list_models("http://example.com")
-        assert result == []
+def test_parse_model_names_models_format():
+    """Test parse_model_names with a 'models' key response format."""
+    models_data = {"models": [{"id": "model1"}, "model2"]}
+    assert parse_model_names(models_data) == ["model1", "model2"]
 
 
-def test_list_models_invalid_format():
-    """Test list_models with invalid response format."""
-    models_data = {"unknown_key": "unknown_value"}
+def test_parse_model_names_string_list_containing_data():
+    """Test that a plain string list is not mistaken for an OpenAI-style dict."""
+    assert parse_model_names(["data", "model2"]) == ["data", "model2"]
 
-    with patch('cci.utils.models_fetch.fetch_models') as mock_fetch:
-        mock_fetch.return_value = models_data
 
-        result = list_models("http://example.com")
-        assert result == []
+def test_parse_model_names_empty():
+    """Test parse_model_names with no data."""
+    assert parse_model_names(None) == []
+    assert parse_model_names({}) == []
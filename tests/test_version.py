@@ -1,20 +1,44 @@
 """Tests for the version utility module."""
 
 from importlib.metadata import PackageNotFoundError
-from unittest.mock import patch
+from unittest.mock import Mock
+
+import pytest
 
 from cci.utils.version import get_project_version
 
 
-def test_get_project_version_success():
+@pytest.fixture(autouse=True)
+def clear_version_cache():
+    """Clear the cached version so each test sees its own patched metadata."""
+    get_project_version.cache_clear()
+    yield
+    get_project_version.cache_clear()
+
+
+def test_get_project_version_success(monkeypatch):
     """Test successful retrieval of project version from package metadata."""
-    with patch("cci.utils.version.version", return_value="0.1.3"):
-        version = get_project_version()
-        assert version == "0.1.3"
+    monkeypatch.setattr("cci.utils.version.version", lambda distribution_name: "0.1.3")
 
+    assert get_project_version() == "0.1.3"
 
-def test_get_project_version_package_not_found():
+
+def test_get_project_version_package_not_found(monkeypatch):
     """Test when package is not installed."""
-    with patch("cci.utils.version.version", side_effect=PackageNotFoundError()):
-        version = get_project_version()
-        assert version is None
+    def version(distribution_name):
+        raise PackageNotFoundError(distribution_name)
+
+    monkeypatch.setattr("cci.utils.version.version", version)
+
+    assert get_project_version() is None
+
+
+def test_get_project_version_cached(monkeypatch):
+    """Test that package metadata is only read once."""
+    mock_version = Mock(return_value="0.1.3")
+    monkeypatch.setattr("cci.utils.version.version", mock_version)
+
+    get_project_version()
+    get_project_version()
+
+    mock_version.assert_called_once_with("claude-code-interceptor")